@@ -0,0 +1,76 @@
+"""
+Batched append-only writer for the persistence benchmarks
+
+Queued records are submitted with a single vectored write (writev) per
+flush instead of one write syscall per record, followed by one fsync.
+A lone record falls back to a plain write, where writev buys nothing.
+"""
+
+import os
+
+try:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+except (AttributeError, ValueError, OSError):
+    IOV_MAX = 1024
+
+
+class BatchWriter:
+    """Append-only log writer that coalesces queued records into writev calls"""
+
+    def __init__(self, path, depth=128):
+        """
+        Open (and truncate) the log file
+
+        Args:
+            path: Log file path
+            depth: Max records queued before they are written out (capped at IOV_MAX)
+        """
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        self.depth = max(1, min(depth, IOV_MAX))
+        self.pending = []
+
+    def submit(self, data):
+        """Queue one record (bytes); written out once depth records are queued"""
+        self.pending.append(data)
+        if len(self.pending) >= self.depth:
+            self._write_pending()
+
+    def flush(self):
+        """Write all queued records and fsync the log"""
+        self._write_pending()
+        os.fsync(self.fd)
+
+    def close(self):
+        """Write any queued records and close the log (no fsync)"""
+        if self.fd is None:
+            return
+        try:
+            self._write_pending()
+        finally:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write_pending(self):
+        if not self.pending:
+            return
+
+        buffers = self.pending
+        if len(buffers) == 1:
+            written = os.write(self.fd, buffers[0])
+        else:
+            written = os.writev(self.fd, buffers)
+
+        # Regular files rarely short-write, but finish the tail if they do
+        total = sum(len(b) for b in buffers)
+        if written < total:
+            remaining = memoryview(b"".join(buffers))[written:]
+            while remaining:
+                remaining = remaining[os.write(self.fd, remaining):]
+
+        self.pending = []
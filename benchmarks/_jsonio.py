@@ -0,0 +1,35 @@
+"""
+JSON encode/decode shim for benchmark scripts
+
+Prefers orjson when installed and falls back to the stdlib json module.
+Both paths return/accept UTF-8 bytes so callers can use binary file I/O.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def loads(data):
+    """Parse JSON from bytes, bytearray, memoryview or str"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(obj, indent=False):
+    """Serialize obj to UTF-8 JSON bytes (2-space indent when indent=True)"""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+    if indent:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,22 @@
+"""
+Latency statistics helpers shared by the benchmark scripts
+"""
+
+
+def percentiles(values, quantiles):
+    """
+    Lower (nearest-rank) percentiles of values
+
+    Sorts once in C and indexes each quantile, matching the
+    sorted[int(n * q)] convention the benchmark reports have always used.
+
+    Args:
+        values: Non-empty sequence of numbers (list or array.array)
+        quantiles: Iterable of fractions in [0, 1]
+
+    Returns:
+        list: One value per quantile
+    """
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return [ordered[min(int(len(ordered) * q), last)] for q in quantiles]
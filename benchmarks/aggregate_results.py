@@ -3,31 +3,40 @@
 Aggregate all benchmark results into a single summary JSON
 """
 
-import json
-import subprocess
+import functools
 from datetime import datetime
 from pathlib import Path
 
+import _jsonio
+
 
 def get_git_commit():
-    """Get current git commit hash"""
+    """Get current git commit hash (read from .git, no git subprocess)"""
     try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--short", "HEAD"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout.strip()
+        git_dir = Path(".git")
+        head = (git_dir / "HEAD").read_text().strip()
+        if not head.startswith("ref: "):
+            return head[:7]
+
+        ref = head[5:]
+        ref_path = git_dir / ref
+        if ref_path.exists():
+            return ref_path.read_text().strip()[:7]
+
+        # Ref may only exist in packed-refs after a gc
+        for line in (git_dir / "packed-refs").read_text().splitlines():
+            if line.endswith(" " + ref):
+                return line[:7]
+        return "unknown"
     except:
         return "unknown"
 
 
+@functools.lru_cache(maxsize=None)
 def load_json(path):
-    """Load JSON file safely"""
+    """Load JSON file safely (memoized per path; callers must not mutate the result)"""
     try:
-        with open(path) as f:
-            return json.load(f)
+        return _jsonio.loads(Path(path).read_bytes())
     except:
         return None
 
@@ -127,14 +136,14 @@ def generate_notes():
     return "; ".join(notes)
 
 
-def main():
-    import argparse
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--out", default="benchmarks/results_summary.json")
-    args = parser.parse_args()
+def aggregate_all():
+    """
+    Build the full benchmark summary
 
-    # Aggregate all results
-    summary = {
+    Each results file is parsed once (load_json is memoized) and shared by
+    every section and the notes.
+    """
+    return {
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "commit": get_git_commit(),
         "persistence": aggregate_persistence(),
@@ -144,9 +153,19 @@ def main():
         "notes": generate_notes()
     }
 
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default="benchmarks/results_summary.json")
+    args = parser.parse_args()
+
+    # Aggregate all results
+    summary = aggregate_all()
+
     # Save summary
-    with open(args.out, 'w') as f:
-        json.dump(summary, f, indent=2)
+    with open(args.out, 'wb') as f:
+        f.write(_jsonio.dumps(summary, indent=True))
 
     print(f"Aggregated results saved to: {args.out}")
     print()
@@ -3,9 +3,12 @@
 Dynamics determinism benchmark
 """
 
+import functools
 import hashlib
-import json
+import multiprocessing as mp
+import os
 import sys
+from array import array
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent / ".." / "runtime"))
@@ -13,9 +16,19 @@ sys.path.insert(0, str(Path(__file__).parent / ".." / "runtime"))
 from dynamics.engine import Glyph, DynamicsEngine
 from cli import create_glyph
 
+import _jsonio
 
-def run_dynamics_sequence(seed, num_steps=100, save_snapshots=True):
-    """Run dynamics for num_steps and return sequence of states"""
+
+def run_dynamics_sequence(seed, num_steps=100, save_snapshots=False):
+    """
+    Run dynamics for num_steps and return sequence of states
+
+    States are kept column-wise as (energies, activation_counts) arrays
+    indexed by step; use state_at() to get a per-step dict.
+
+    With save_snapshots, every 10th step is appended to one
+    glyph_<id>.snapshots.jsonl per seed, written and fsynced once at the end.
+    """
     # Create initial glyph with seed-based content
     content = f"Dynamics seed {seed}"
     metadata = {
@@ -27,77 +40,133 @@ def run_dynamics_sequence(seed, num_steps=100, save_snapshots=True):
     glyph_id, glyph_data = create_glyph.create_glyph(content, metadata)
     glyph = Glyph.from_dict(glyph_data)
 
-    # Create engine
+    # Fresh engine per run so memoized state cannot carry between runs
     engine = DynamicsEngine(activation_threshold=1.0, decay_rate=0.1)
 
-    # Run steps and collect states
-    states = []
-    snapshots_dir = Path("persistence") / "snapshots" / f"seed_{seed}"
-
-    if save_snapshots:
-        snapshots_dir.mkdir(parents=True, exist_ok=True)
+    # Run steps and collect states (one typed column per field)
+    energies = array('d', [0.0]) * num_steps
+    activation_counts = array('q', [0]) * num_steps
+    snapshots = []
 
     for step in range(num_steps):
         # Apply dynamics step
         glyph, step_info = engine.step(glyph, time_delta=1)
 
         # Record state
-        state = {
-            "step": step,
-            "energy": glyph.energy,
-            "activated": glyph.activation_count > 0,
-            "activation_count": glyph.activation_count
-        }
-        states.append(state)
+        energies[step] = glyph.energy
+        activation_counts[step] = glyph.activation_count
 
-        # Save snapshot if requested
+        # Collect snapshot if requested
         if save_snapshots and step % 10 == 0:  # Save every 10th step
-            snapshot_path = snapshots_dir / f"glyph_{glyph_id}.step_{step}.json"
-            with open(snapshot_path, 'w') as f:
-                json.dump(glyph.to_dict(), f, indent=2)
+            snapshots.append(_jsonio.dumps({"step": step, "glyph": glyph.to_dict()}) + b"\n")
+
+    if snapshots:
+        snapshots_dir = Path("persistence") / "snapshots" / f"seed_{seed}"
+        snapshots_dir.mkdir(parents=True, exist_ok=True)
+
+        with open(snapshots_dir / f"glyph_{glyph_id}.snapshots.jsonl", 'wb') as f:
+            f.writelines(snapshots)
+            f.flush()
+            os.fsync(f.fileno())
+
+    return (energies, activation_counts), glyph_id
+
+
+def state_at(states, step):
+    """Build the state dict for one step of a run_dynamics_sequence result"""
+    energies, activation_counts = states
+    return {
+        "step": step,
+        "energy": energies[step],
+        "activated": activation_counts[step] > 0,
+        "activation_count": activation_counts[step]
+    }
 
-    return states, glyph_id
 
+def _find_diffs(states1, states2):
+    """
+    Steps at which two run_dynamics_sequence results differ
 
-def test_determinism(num_seeds=10, num_steps=100):
-    """Test that dynamics is deterministic across multiple runs"""
+    Whole-column equality (a C-level compare of the typed arrays) settles
+    the common all-equal case; only a mismatch falls back to a per-step scan.
+    """
+    if states1 == states2:
+        return []
+
+    (e1, c1), (e2, c2) = states1, states2
+    return [i for i in range(len(e1)) if e1[i] != e2[i] or c1[i] != c2[i]]
+
+
+def _run_seed(seed, num_steps, emit_snapshots=False):
+    """Run one seed twice and compare (top-level so worker processes can pickle it)"""
+    # Run twice with same seed
+    states1, glyph_id1 = run_dynamics_sequence(seed, num_steps,
+                                               save_snapshots=(emit_snapshots and seed == 0))
+    states2, glyph_id2 = run_dynamics_sequence(seed, num_steps, save_snapshots=False)
+
+    # Check if IDs match (same content = same ID)
+    ids_match = (glyph_id1 == glyph_id2)
+
+    # Check if state sequences match; only mismatched steps become dicts
+    diffs = [
+        {
+            "step": i,
+            "state1": state_at(states1, i),
+            "state2": state_at(states2, i)
+        }
+        for i in _find_diffs(states1, states2)
+    ]
+
+    deterministic = (ids_match and len(diffs) == 0)
+
+    return {
+        "seed": seed,
+        "deterministic": deterministic,
+        "ids_match": ids_match,
+        "num_diffs": len(diffs),
+        "diffs": diffs[:5]  # Only include first 5 diffs
+    }
+
+
+def test_determinism(num_seeds=10, num_steps=100, workers=None, emit_snapshots=False):
+    """
+    Test that dynamics is deterministic across multiple runs
+
+    Seeds are independent, so they run in a process pool (workers=None
+    uses every CPU; workers=1 runs serially in-process). Snapshots of
+    seed 0 are only written when emit_snapshots is set.
+    """
     results = []
 
     print(f"Testing determinism across {num_seeds} seeds, {num_steps} steps each...")
 
-    for seed in range(num_seeds):
-        print(f"  Seed {seed}...")
-
-        # Run twice with same seed
-        states1, glyph_id1 = run_dynamics_sequence(seed, num_steps, save_snapshots=(seed == 0))
-        states2, glyph_id2 = run_dynamics_sequence(seed, num_steps, save_snapshots=False)
+    run_seed = functools.partial(_run_seed, num_steps=num_steps, emit_snapshots=emit_snapshots)
 
-        # Check if IDs match (same content = same ID)
-        ids_match = (glyph_id1 == glyph_id2)
+    if workers == 1:
+        pool = None
+        completed = map(run_seed, range(num_seeds))
+    else:
+        pool = mp.Pool(workers)
+        completed = pool.imap_unordered(run_seed, range(num_seeds))
 
-        # Check if state sequences match
-        diffs = []
-        for i, (s1, s2) in enumerate(zip(states1, states2)):
-            if s1 != s2:
-                diffs.append({
-                    "step": i,
-                    "state1": s1,
-                    "state2": s2
-                })
+    try:
+        for result in completed:
+            print(f"  Seed {result['seed']}...")
 
-        deterministic = (ids_match and len(diffs) == 0)
+            if not result["deterministic"]:
+                print(f"    WARNING: Non-deterministic behavior detected!")
+                print(f"    IDs match: {result['ids_match']}")
+                print(f"    Diffs found: {result['num_diffs']}")
 
-        results.append({
-            "seed": seed,
-            "deterministic": deterministic,
-            "ids_match": ids_match,
-            "diffs": diffs[:5]  # Only include first 5 diffs
-        })
+            del result["num_diffs"]
+            results.append(result)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
 
-        if not deterministic:
-            print(f"    WARNING: Non-deterministic behavior detected!")
-            print(f"    IDs match: {ids_match}")
-            print(f"    Diffs found: {len(diffs)}")
+    # Completion order is arbitrary; report in seed order
+    results.sort(key=lambda r: r["seed"])
 
     return results
 
@@ -107,11 +176,15 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--num-seeds", type=int, default=10)
     parser.add_argument("--num-steps", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes (default: CPU count, 1=serial)")
+    parser.add_argument("--emit-snapshots", action="store_true",
+                        help="Write seed 0 snapshots to persistence/snapshots/")
     parser.add_argument("--output", default="benchmarks/dynamics_determinism.json")
     args = parser.parse_args()
 
     # Run determinism test
-    results = test_determinism(args.num_seeds, args.num_steps)
+    results = test_determinism(args.num_seeds, args.num_steps, args.workers, args.emit_snapshots)
 
     # Analyze
     all_deterministic = all(r["deterministic"] for r in results)
@@ -130,8 +203,8 @@ def main():
                 print(f"    Seed {r['seed']}: {len(r['diffs'])} diffs")
 
     # Save results
-    with open(args.output, 'w') as f:
-        json.dump(results, f, indent=2)
+    with open(args.output, 'wb') as f:
+        f.write(_jsonio.dumps(results, indent=True))
 
     print(f"\nResults saved to: {args.output}")
 
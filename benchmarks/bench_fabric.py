@@ -3,42 +3,41 @@
 Relation fabric latency benchmark
 """
 
-import json
 import sys
 import time
+from array import array
 from pathlib import Path
 
+from _jsonio import dumps, loads
+from _stats import percentiles
+
 
 def simulate_message_routing(num_messages=10000):
-    """Simulate message routing with loopback"""
-    latencies = []
+    """Simulate message routing with loopback (returns latencies in ns)"""
+    latencies_ns = array('q', [0]) * num_messages
+
+    # One message dict, refilled in place each iteration
+    message = {"id": 0, "content": ""}
 
     for i in range(num_messages):
         # Simulate message send/receive
-        start_time = time.perf_counter()
+        start_ns = time.perf_counter_ns()
 
         # Loopback simulation: minimal processing
-        message = {"id": i, "content": f"message_{i}"}
-        _ = json.dumps(message)  # Serialize
-        _ = json.loads(json.dumps(message))  # Deserialize (loopback)
-
-        end_time = time.perf_counter()
-
-        latency_ms = (end_time - start_time) * 1000
-        latencies.append(latency_ms)
+        message["id"] = i
+        message["content"] = f"message_{i}"
+        blob = dumps(message)  # Serialize
+        _ = loads(blob)  # Deserialize (loopback)
 
-    return latencies
+        latencies_ns[i] = time.perf_counter_ns() - start_ns
 
+    return latencies_ns
 
-def analyze_latencies(latencies):
-    """Calculate latency percentiles"""
-    sorted_latencies = sorted(latencies)
-    n = len(sorted_latencies)
 
-    p50 = sorted_latencies[int(n * 0.50)]
-    p95 = sorted_latencies[int(n * 0.95)]
-    p99 = sorted_latencies[int(n * 0.99)]
-    avg = sum(sorted_latencies) / n
+def analyze_latencies(latencies_ns):
+    """Calculate latency percentiles (input in ns, reported in ms)"""
+    p50, p95, p99 = (ns / 1e6 for ns in percentiles(latencies_ns, (0.50, 0.95, 0.99)))
+    avg = sum(latencies_ns) / len(latencies_ns) / 1e6
 
     return {
         "p50_ms": round(p50, 4),
@@ -75,8 +74,8 @@ def main():
     print(f"  Avg latency: {stats['avg_ms']} ms")
 
     # Save results
-    with open(args.output, 'w') as f:
-        json.dump(stats, f, indent=2)
+    with open(args.output, 'wb') as f:
+        f.write(dumps(stats, indent=True))
 
     print(f"\nResults saved to: {args.output}")
 
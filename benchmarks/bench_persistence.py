@@ -4,11 +4,11 @@ Persistence benchmark - measure write latency and crash safety
 """
 
 import hashlib
-import json
 import os
 import signal
 import sys
 import time
+from array import array
 from pathlib import Path
 
 # Add runtime to path
@@ -16,10 +16,15 @@ sys.path.insert(0, str(Path(__file__).parent / ".." / "runtime"))
 
 from cli import create_glyph
 
+import _jsonio
+from _batch_writer import BatchWriter
+from _stats import percentiles
+
 
 def bench_write_latency(num_glyphs=10000):
     """Benchmark write latency for N glyphs"""
     results = []
+    progress = []  # Checkpoints, printed after the loop to keep I/O out of it
 
     print(f"Benchmarking {num_glyphs} glyph writes...")
 
@@ -28,14 +33,13 @@ def bench_write_latency(num_glyphs=10000):
         metadata = {"energy": 1.0 + (i % 10), "bench_id": i}
 
         # Measure create + save time
-        start_time = time.perf_counter()
+        start_ns = time.perf_counter_ns()
 
         try:
             glyph_id, glyph_data = create_glyph.create_glyph(content, metadata)
-            file_path = create_glyph.save_glyph(glyph_id, glyph_data)
+            file_path = create_glyph.save_glyph(glyph_id, glyph_data, dedup=False)
 
-            end_time = time.perf_counter()
-            latency_ms = (end_time - start_time) * 1000
+            latency_ms = (time.perf_counter_ns() - start_ns) / 1e6
 
             results.append({
                 "id": glyph_id,
@@ -44,8 +48,7 @@ def bench_write_latency(num_glyphs=10000):
             })
 
         except Exception as e:
-            end_time = time.perf_counter()
-            latency_ms = (end_time - start_time) * 1000
+            latency_ms = (time.perf_counter_ns() - start_ns) / 1e6
 
             results.append({
                 "id": f"error_{i}",
@@ -55,23 +58,102 @@ def bench_write_latency(num_glyphs=10000):
             })
 
         if (i + 1) % 1000 == 0:
-            print(f"  {i + 1} glyphs written...")
+            progress.append(i + 1)
+
+    for count in progress:
+        print(f"  {count} glyphs written...")
+
+    return results
+
+
+def bench_write_latency_batched(num_glyphs=10000, window_ms=5, batch_size=32, max_batch_size=1024):
+    """
+    Benchmark group-commit writes for N glyphs
+
+    Glyphs are appended to a single log file and made durable with one
+    writev + fsync per batch. A batch commits when it holds batch_size
+    glyphs or window_ms has elapsed since the batch was opened, whichever
+    comes first. batch_size adapts between commits: it doubles (up to
+    max_batch_size) when batches fill before the window closes, and
+    shrinks to the observed batch size when the window closes first.
+
+    Per-glyph latency is commit time minus enqueue time.
+    """
+    results = []
+    pending = []  # (glyph_id, enqueue_time)
+    progress = []  # Checkpoints, printed after the loop to keep I/O out of it
+    window_s = window_ms / 1000
+
+    log_path = create_glyph.get_persistence_path() / "bench_batched.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def commit():
+        try:
+            writer.flush()
+            error = None
+        except OSError as e:
+            error = str(e)
+
+        commit_time = time.perf_counter()
+        for glyph_id, enqueue_time in pending:
+            result = {
+                "id": glyph_id,
+                "write_latency_ms": round((commit_time - enqueue_time) * 1000, 3),
+                "fsync_ok": error is None
+            }
+            if error is not None:
+                result["error"] = error
+            results.append(result)
+        pending.clear()
+
+    print(f"Benchmarking {num_glyphs} batched glyph writes (window={window_ms}ms)...")
+
+    try:
+        with BatchWriter(log_path, depth=max_batch_size) as writer:
+            window_start = time.perf_counter()
+
+            for i in range(num_glyphs):
+                content = f"Benchmark glyph {i}"
+                metadata = {"energy": 1.0 + (i % 10), "bench_id": i}
+
+                enqueue_time = time.perf_counter()
+                glyph_id, glyph_data = create_glyph.create_glyph(content, metadata)
+                writer.submit(_jsonio.dumps(glyph_data) + b"\n")
+                pending.append((glyph_id, enqueue_time))
+
+                if len(pending) >= batch_size:
+                    commit()
+                    batch_size = min(batch_size * 2, max_batch_size)
+                    window_start = time.perf_counter()
+                elif time.perf_counter() - window_start >= window_s:
+                    batch_size = max(len(pending), 1)
+                    commit()
+                    window_start = time.perf_counter()
+
+                if (i + 1) % 1000 == 0:
+                    progress.append(i + 1)
+
+            if pending:
+                commit()
+    finally:
+        # The log only exists to time the commits; don't leave it behind
+        log_path.unlink(missing_ok=True)
+
+    for count in progress:
+        print(f"  {count} glyphs written...")
 
     return results
 
 
 def analyze_results(results):
     """Analyze latency results"""
-    latencies = [r["write_latency_ms"] for r in results if r["fsync_ok"]]
-    latencies.sort()
+    latencies = array('d', (r["write_latency_ms"] for r in results if r["fsync_ok"]))
 
     n = len(latencies)
     if n == 0:
         return {"median_ms": 0, "p95_ms": 0, "p99_ms": 0, "mean_ms": 0}
 
-    median = latencies[n // 2]
-    p95 = latencies[int(n * 0.95)]
-    p99 = latencies[int(n * 0.99)]
+    median, p95, p99 = percentiles(latencies, (0.50, 0.95, 0.99))
     mean = sum(latencies) / n
 
     failed = sum(1 for r in results if not r["fsync_ok"])
@@ -91,11 +173,25 @@ def main():
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("--num-glyphs", type=int, default=10000)
-    parser.add_argument("--output", default="benchmarks/persistence_results.json")
+    parser.add_argument("--batch-window-ms", type=int, default=0,
+                        help="Group-commit window in ms (0=fsync every glyph)")
+    parser.add_argument("--batch-size", type=int, default=32,
+                        help="Initial group-commit batch size")
+    parser.add_argument("--output", default=None,
+                        help="Output path (default: benchmarks/persistence_results[_batchN].json)")
     args = parser.parse_args()
 
+    if args.output is None:
+        if args.batch_window_ms > 0:
+            args.output = f"benchmarks/persistence_results_batch{args.batch_window_ms}.json"
+        else:
+            args.output = "benchmarks/persistence_results.json"
+
     # Run benchmark
-    results = bench_write_latency(args.num_glyphs)
+    if args.batch_window_ms > 0:
+        results = bench_write_latency_batched(args.num_glyphs, args.batch_window_ms, args.batch_size)
+    else:
+        results = bench_write_latency(args.num_glyphs)
 
     # Analyze
     stats = analyze_results(results)
@@ -109,16 +205,28 @@ def main():
     print(f"  P99 latency: {stats['p99_ms']} ms")
     print(f"  Mean latency: {stats['mean_ms']} ms")
 
-    # Save full results
+    # Save stats (small, human-read: indented) and per-glyph results
+    # (large, machine-read: compact JSON Lines next to it)
+    results_path = Path(args.output).with_suffix(".jsonl")
+
     output_data = {
+        "config": {
+            "count": args.num_glyphs,
+            "batch_window_ms": args.batch_window_ms,
+            "batch_size": args.batch_size
+        },
         "stats": stats,
-        "results": results
+        "results_file": results_path.name
     }
 
-    with open(args.output, 'w') as f:
-        json.dump(output_data, f, indent=2)
+    with open(args.output, 'wb') as f:
+        f.write(_jsonio.dumps(output_data, indent=True))
+
+    with open(results_path, 'wb') as f:
+        f.writelines(_jsonio.dumps(r) + b"\n" for r in results)
 
-    print(f"\nFull results saved to: {args.output}")
+    print(f"\nStats saved to: {args.output}")
+    print(f"Full results saved to: {results_path}")
 
     return 0
 
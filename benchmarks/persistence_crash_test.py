@@ -5,19 +5,96 @@ Persistence crash safety test - verify atomic writes
 
 import json
 import os
+import queue
 import random
 import signal
 import sys
 import tempfile
+import threading
 import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent / ".." / "runtime"))
 from cli import create_glyph
 
+import _jsonio
+
+
+READ_BUFFER_SIZE = 64 * 1024
+
+
+def _read_file(path, buf):
+    """
+    Read a whole file into buf with os.readv, growing buf if it fills up
+
+    Returns: (buf, nbytes) - buf may be a new, larger bytearray
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        n = os.readv(fd, [buf])
+        while n == len(buf):
+            buf.extend(bytes(len(buf)))
+            n += os.preadv(fd, [memoryview(buf)[n:]], n)
+        return buf, n
+    finally:
+        os.close(fd)
+
+
+def _verify_one(glyph_id, file_path, buf, results):
+    """
+    Check that file_path holds a complete glyph with the expected ID
+
+    Returns buf (possibly grown) so the caller can reuse it.
+    """
+    # Try to read and parse JSON
+    try:
+        buf, n = _read_file(file_path, buf)
+
+        # Cheap negative check: a file that doesn't even contain its
+        # ID can't be valid, so skip parsing it. A hit still gets the
+        # full parse below.
+        if buf.find(glyph_id.encode(), 0, n) == -1:
+            print(f"  ERROR: Corrupted file: {file_path}")
+            results["corrupted_files"] += 1
+            return buf
+
+        data = _jsonio.loads(memoryview(buf)[:n])
+
+        # Verify structure
+        if "id" not in data or data["id"] != glyph_id:
+            print(f"  ERROR: Corrupted file: {file_path}")
+            results["corrupted_files"] += 1
+
+    except FileNotFoundError:
+        print(f"  ERROR: File missing: {file_path}")
+        results["partial_files"] += 1
+
+    except json.JSONDecodeError as e:
+        print(f"  ERROR: Invalid JSON in {file_path}: {e}")
+        results["corrupted_files"] += 1
+
+    except Exception as e:
+        print(f"  ERROR: Cannot read {file_path}: {e}")
+        results["corrupted_files"] += 1
+
+    return buf
+
+
+def _verifier(verify_q, results):
+    """Verify (glyph_id, file_path) items from verify_q until a None sentinel"""
+    buf = bytearray(READ_BUFFER_SIZE)
+    while (item := verify_q.get()) is not None:
+        buf = _verify_one(*item, buf, results)
+
 
 def test_concurrent_writes_with_crash(count=1000):
-    """Test concurrent writes with simulated crash"""
+    """
+    Test concurrent writes with simulated crash
+
+    Each file is verified by a background thread right after it is saved,
+    while it is still in page cache, instead of in a second pass over all
+    files once writing is done.
+    """
     print(f"Testing crash safety with {count} concurrent writes...")
 
     results = {
@@ -31,58 +108,47 @@ def test_concurrent_writes_with_crash(count=1000):
 
     persistence_dir = create_glyph.get_persistence_path()
 
-    # Create many glyphs
-    glyph_ids = []
-    for i in range(count):
-        content = f"Crash test glyph {i}"
-        metadata = {"energy": random.uniform(1.0, 10.0), "test_id": i}
-
-        try:
-            glyph_id, glyph_data = create_glyph.create_glyph(content, metadata)
-            file_path = create_glyph.save_glyph(glyph_id, glyph_data)
-            glyph_ids.append((glyph_id, file_path))
-            results["completed_writes"] += 1
+    # Verifier only touches partial_files/corrupted_files; the writer below
+    # owns the other counters
+    verify_q = queue.Queue(maxsize=1024)
+    verifier = threading.Thread(target=_verifier, args=(verify_q, results), daemon=True)
+    verifier.start()
 
-        except Exception as e:
-            print(f"  Write {i} failed: {e}")
-            results["fsync_ok"] = False
-
-        if (i + 1) % 100 == 0:
-            print(f"  {i + 1} writes attempted...")
+    # Create many glyphs
+    try:
+        for i in range(count):
+            content = f"Crash test glyph {i}"
+            metadata = {"energy": random.uniform(1.0, 10.0), "test_id": i}
+
+            try:
+                glyph_id, glyph_data = create_glyph.create_glyph(content, metadata)
+                file_path = create_glyph.save_glyph(glyph_id, glyph_data, dedup=False)
+                verify_q.put((glyph_id, file_path))
+                results["completed_writes"] += 1
+
+            except Exception as e:
+                print(f"  Write {i} failed: {e}")
+                results["fsync_ok"] = False
+
+            if (i + 1) % 100 == 0:
+                print(f"  {i + 1} writes attempted...")
+    finally:
+        verify_q.put(None)
 
     print(f"\nCompleted writes: {results['completed_writes']}")
 
-    # Verify all written files
+    # Wait for the verifier to drain what is still queued
     print("\nVerifying written files...")
-    for glyph_id, file_path in glyph_ids:
-        file_path = Path(file_path)
-
-        if not file_path.exists():
-            print(f"  ERROR: File missing: {file_path}")
-            results["partial_files"] += 1
-            continue
-
-        # Try to read and parse JSON
-        try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-
-            # Verify structure
-            if "id" not in data or data["id"] != glyph_id:
-                print(f"  ERROR: Corrupted file: {file_path}")
-                results["corrupted_files"] += 1
-
-        except json.JSONDecodeError as e:
-            print(f"  ERROR: Invalid JSON in {file_path}: {e}")
-            results["corrupted_files"] += 1
-
-        except Exception as e:
-            print(f"  ERROR: Cannot read {file_path}: {e}")
-            results["corrupted_files"] += 1
+    verifier.join()
 
     # Check for temp files
     print("\nChecking for temporary files...")
-    temp_files = list(persistence_dir.rglob(".tmp_glyph_*"))
+    temp_files = [
+        os.path.join(root, name)
+        for root, _, names in os.walk(persistence_dir)
+        for name in names
+        if name.startswith(".tmp_glyph_")
+    ]
     results["temp_files_remaining"] = len(temp_files)
 
     if temp_files:
@@ -141,7 +207,7 @@ Implementation Details:
 -----------------------
 - Uses tempfile.mkstemp() for atomic file creation
 - Writes complete glyph data to temp file
-- Calls os.fsync() to flush data to disk
+- Calls os.fdatasync() to flush data to disk (os.fsync() where fdatasync is unavailable)
 - Performs atomic os.rename() to final location
 - Exception handler cleans up temp files on error
 
@@ -7,7 +7,8 @@ Compares Python and C++ implementations of the merge primitive.
 
 import json
 import sys
-import time
+import timeit
+from array import array
 from pathlib import Path
 
 # Add runtime to path
@@ -25,9 +26,25 @@ except ImportError:
 sys.path.insert(0, str(Path(__file__).parent / ".." / "runtime" / "spu"))
 import spu_wrapper
 
+from _stats import percentiles
 
-def benchmark_implementation(name, merge_func, glyph_class, iterations=50000):
-    """Benchmark a merge implementation"""
+# Ops per timed sample: long enough to swamp timer overhead, short enough
+# to still give a latency distribution
+BATCH_SIZE = 100
+
+
+def benchmark_implementation(name, merge_func, glyph_class, iterations=50000, merge_batch=None,
+                             time_merge=None):
+    """
+    Benchmark a merge implementation
+
+    Ops run in timeit batches of BATCH_SIZE; latency percentiles are over
+    the per-op average of each batch, so timer cost isn't billed per op.
+    When merge_batch is given, each batch is a single merge_batch(pairs)
+    call instead of BATCH_SIZE separate merge_func calls. When time_merge
+    is given, the whole timing loop runs natively via
+    time_merge(g1, g2, batches, batch_size) and no Python runs per op.
+    """
     print(f"Benchmarking {name} ({iterations} iterations)...")
 
     # Create test glyphs
@@ -45,33 +62,39 @@ def benchmark_implementation(name, merge_func, glyph_class, iterations=50000):
     g2.activation_count = 0
     g2.last_update_time = 0
 
-    # Warmup
-    for _ in range(1000):
-        merge_func(g1, g2)
-
-    # Benchmark
-    latencies = []
-    start_total = time.perf_counter()
-
-    for _ in range(iterations):
-        start = time.perf_counter()
-        result = merge_func(g1, g2)
-        end = time.perf_counter()
-        latencies.append((end - start) * 1e6)  # µs
-
-    end_total = time.perf_counter()
-    total_time_ms = (end_total - start_total) * 1000
+    num_batches = max(1, iterations // BATCH_SIZE)
+    iterations = num_batches * BATCH_SIZE
 
-    # Compute stats
-    latencies.sort()
-    min_lat = latencies[0]
-    max_lat = latencies[-1]
-    median_lat = latencies[len(latencies) // 2]
-    p95_lat = latencies[int(len(latencies) * 0.95)]
-    p99_lat = latencies[int(len(latencies) * 0.99)]
-    mean_lat = sum(latencies) / len(latencies)
+    if time_merge is not None:
+        # Warmup, then benchmark
+        time_merge(g1, g2, 1000 // BATCH_SIZE, BATCH_SIZE)
+        samples = time_merge(g1, g2, num_batches, BATCH_SIZE)
+    else:
+        if merge_batch is not None:
+            pairs = [(g1, g2)] * BATCH_SIZE
+            timer = timeit.Timer("f(p)", globals={"f": merge_batch, "p": pairs})
+            calls_per_batch = 1
+        else:
+            timer = timeit.Timer("f(a, b)", globals={"f": merge_func, "a": g1, "b": g2})
+            calls_per_batch = BATCH_SIZE
+
+        # Warmup
+        timer.timeit(number=1000 // BATCH_SIZE * calls_per_batch)
+
+        # Benchmark
+        samples = timer.repeat(repeat=num_batches, number=calls_per_batch)
+
+    total_time = sum(samples)
+    total_time_ms = total_time * 1000
+
+    # Compute stats (per-op µs for each batch)
+    latencies = array('d', (sample / BATCH_SIZE * 1e6 for sample in samples))
+    min_lat, median_lat, p95_lat, p99_lat, max_lat = percentiles(
+        latencies, (0.0, 0.50, 0.95, 0.99, 1.0)
+    )
+    mean_lat = total_time / iterations * 1e6
 
-    ops_per_sec = iterations / (end_total - start_total)
+    ops_per_sec = iterations / total_time
 
     print(f"  Mean latency: {mean_lat:.2f} µs")
     print(f"  Median latency: {median_lat:.2f} µs")
@@ -83,6 +106,7 @@ def benchmark_implementation(name, merge_func, glyph_class, iterations=50000):
     return {
         "implementation": name,
         "iterations": iterations,
+        "batch_size": BATCH_SIZE,
         "latency_us": {
             "min": min_lat,
             "max": max_lat,
@@ -118,7 +142,8 @@ def main():
     # Benchmark C++ implementation (if available)
     if has_cpp_binding:
         cpp_result = benchmark_implementation(
-            "cpp_pybind11", spu_merge.merge, spu_merge.Glyph, args.iterations
+            "cpp_pybind11", spu_merge.merge, spu_merge.Glyph, args.iterations,
+            merge_batch=getattr(spu_merge, "merge_batch", None)
         )
         results.append(cpp_result)
 
@@ -127,6 +152,19 @@ def main():
         print(f"Speedup (C++ vs Python): {speedup:.2f}x\n")
 
         cpp_result["speedup_vs_python"] = speedup
+
+        # Same merge with the timing loop in C++: the pybind11 row above
+        # includes per-call binding overhead, this one is the merge alone
+        time_merge = getattr(spu_merge, "time_merge", None)
+        if time_merge is not None:
+            native_result = benchmark_implementation(
+                "cpp_native_loop", spu_merge.merge, spu_merge.Glyph, args.iterations,
+                time_merge=time_merge
+            )
+            native_result["speedup_vs_python"] = (
+                python_result["latency_us"]["mean"] / native_result["latency_us"]["mean"]
+            )
+            results.append(native_result)
     else:
         print("Note: C++ binding not available (pybind11 not installed)")
         print("To build: pip install pybind11 && cd runtime/spu && python3 setup.py build_ext --inplace")
@@ -135,8 +173,7 @@ def main():
         # Compare to C++ benchmark results if available
         cpp_bench_file = Path("benchmarks/merge_ref_results.json")
         if cpp_bench_file.exists():
-            with open(cpp_bench_file) as f:
-                cpp_bench = json.load(f)
+            cpp_bench = json.loads(cpp_bench_file.read_bytes())
 
             cpp_latency = cpp_bench["latency_us"]["mean"]
             speedup = python_result["latency_us"]["mean"] / cpp_latency
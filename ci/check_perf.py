@@ -26,12 +26,29 @@ class Colors:
     RESET = "\033[0m"
     BOLD = "\033[1m"
 
+    @classmethod
+    def disable(cls):
+        """Blank every code (for output that is not a terminal)"""
+        cls.GREEN = cls.YELLOW = cls.RED = cls.RESET = cls.BOLD = ""
+
+
+# Key paths each document must contain. They are checked at load time so
+# that a renamed or misspelled key fails with a clear error instead of a
+# KeyError halfway through the report
+BASELINE_SCHEMA = (
+    ("spu", "merge", "avg_latency_us"),
+    ("spu", "merge", "ops_per_sec"),
+    ("persistence", "p99_ms"),
+)
+SPU_ROW_SCHEMA = (("primitive",), ("avg_latency_us",), ("ops_per_sec",))
+PERSISTENCE_SCHEMA = (("stats", "p99_ms"),)
+
 
 def load_json(path):
     """Load JSON file"""
     try:
-        with open(path, "r") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            return json.loads(f.read())
     except FileNotFoundError:
         print(f"Error: File not found: {path}")
         return None
@@ -40,73 +57,98 @@ def load_json(path):
         return None
 
 
-def check_spu_regression(baseline, current, thresholds):
-    """
-    Check SPU benchmark for regressions
+def _missing_field(doc, schema):
+    """Return the first key path in schema absent from doc (dotted), or None"""
+    for key_path in schema:
+        value = doc
+        for key in key_path:
+            if not isinstance(value, dict) or key not in value:
+                return ".".join(key_path)
+            value = value[key]
+    return None
 
-    Returns: (passed, messages)
-    """
-    passed = True
-    messages = []
 
-    # Extract metrics
-    baseline_latency = baseline["spu"]["merge"]["avg_latency_us"]
-    baseline_ops = baseline["spu"]["merge"]["ops_per_sec"]
+def validate(doc, schema, path):
+    """
+    Check doc (a dict, or a list of row dicts) against schema
 
-    # Current is a list, get merge primitive
-    current_merge = None
-    for prim in current:
-        if prim["primitive"] == "merge":
-            current_merge = prim
-            break
+    Returns: True if every key path is present, else prints an error and
+    returns False
+    """
+    rows = doc if isinstance(doc, list) else [doc]
+    for i, row in enumerate(rows):
+        missing = _missing_field(row, schema)
+        if missing:
+            where = f"row {i} of {path}" if isinstance(doc, list) else path
+            print(f"Error: Missing field '{missing}' in {where}")
+            return False
+    return True
+
+
+def _check_metric(label, baseline_value, current_value, threshold, unit,
+                  value_fmt=".2f", higher_is_bad=True):
+    """
+    Compare one metric against its baseline
 
-    if not current_merge:
-        return False, ["Error: merge primitive not found in current results"]
+    The change is measured in the bad direction (increase if higher_is_bad,
+    otherwise decrease): above threshold fails, above half of it warns.
 
-    current_latency = current_merge["avg_latency_us"]
-    current_ops = current_merge["ops_per_sec"]
+    Returns: (passed, message)
+    """
+    if higher_is_bad:
+        change_pct = ((current_value - baseline_value) / baseline_value) * 100
+        direction = "increase"
+    else:
+        change_pct = ((baseline_value - current_value) / baseline_value) * 100
+        direction = "decrease"
 
-    # Check latency regression
-    latency_increase_pct = ((current_latency - baseline_latency) / baseline_latency) * 100
+    values = f"({baseline_value:{value_fmt}} → {current_value:{value_fmt}} {unit})"
 
-    if latency_increase_pct > thresholds["spu_latency_increase_pct"]:
-        passed = False
-        messages.append(
-            f"{Colors.RED}✗ SPU latency regression: {latency_increase_pct:.1f}% increase "
-            f"({baseline_latency:.2f} → {current_latency:.2f} µs){Colors.RESET}"
+    if change_pct > threshold:
+        return False, (
+            f"{Colors.RED}✗ {label} regression: {change_pct:.1f}% {direction} "
+            f"{values}{Colors.RESET}"
         )
-    elif latency_increase_pct > thresholds["spu_latency_increase_pct"] / 2:
-        messages.append(
-            f"{Colors.YELLOW}⚠ SPU latency warning: {latency_increase_pct:.1f}% increase "
-            f"({baseline_latency:.2f} → {current_latency:.2f} µs){Colors.RESET}"
-        )
-    else:
-        messages.append(
-            f"{Colors.GREEN}✓ SPU latency OK: {latency_increase_pct:+.1f}% "
-            f"({baseline_latency:.2f} → {current_latency:.2f} µs){Colors.RESET}"
+    if change_pct > threshold / 2:
+        return True, (
+            f"{Colors.YELLOW}⚠ {label} warning: {change_pct:.1f}% {direction} "
+            f"{values}{Colors.RESET}"
         )
+    return True, f"{Colors.GREEN}✓ {label} OK: {change_pct:+.1f}% {values}{Colors.RESET}"
 
-    # Check throughput regression
-    ops_decrease_pct = ((baseline_ops - current_ops) / baseline_ops) * 100
 
-    if ops_decrease_pct > thresholds["spu_throughput_decrease_pct"]:
-        passed = False
-        messages.append(
-            f"{Colors.RED}✗ SPU throughput regression: {ops_decrease_pct:.1f}% decrease "
-            f"({baseline_ops:,} → {current_ops:,} ops/sec){Colors.RESET}"
-        )
-    elif ops_decrease_pct > thresholds["spu_throughput_decrease_pct"] / 2:
-        messages.append(
-            f"{Colors.YELLOW}⚠ SPU throughput warning: {ops_decrease_pct:.1f}% decrease "
-            f"({baseline_ops:,} → {current_ops:,} ops/sec){Colors.RESET}"
-        )
-    else:
-        messages.append(
-            f"{Colors.GREEN}✓ SPU throughput OK: {ops_decrease_pct:+.1f}% "
-            f"({baseline_ops:,} → {current_ops:,} ops/sec){Colors.RESET}"
-        )
+def check_spu_regression(baseline, current_index, thresholds):
+    """
+    Check SPU benchmark for regressions
+
+    current_index maps primitive name -> current result row.
 
-    return passed, messages
+    Returns: (passed, messages)
+    """
+    current_merge = current_index.get("merge")
+    if not current_merge:
+        return False, ["Error: merge primitive not found in current results"]
+
+    baseline_merge = baseline["spu"]["merge"]
+
+    latency_passed, latency_msg = _check_metric(
+        "SPU latency",
+        baseline_merge["avg_latency_us"],
+        current_merge["avg_latency_us"],
+        thresholds["spu_latency_increase_pct"],
+        "µs",
+    )
+    ops_passed, ops_msg = _check_metric(
+        "SPU throughput",
+        baseline_merge["ops_per_sec"],
+        current_merge["ops_per_sec"],
+        thresholds["spu_throughput_decrease_pct"],
+        "ops/sec",
+        value_fmt=",",
+        higher_is_bad=False,
+    )
+
+    return latency_passed and ops_passed, [latency_msg, ops_msg]
 
 
 def check_persistence_regression(baseline, current, thresholds):
@@ -115,34 +157,15 @@ def check_persistence_regression(baseline, current, thresholds):
 
     Returns: (passed, messages)
     """
-    passed = True
-    messages = []
-
-    # Extract metrics
-    baseline_p99 = baseline["persistence"]["p99_ms"]
-    current_p99 = current["stats"]["p99_ms"]
-
-    # Check P99 regression
-    p99_increase_pct = ((current_p99 - baseline_p99) / baseline_p99) * 100
-
-    if p99_increase_pct > thresholds["persistence_p99_increase_pct"]:
-        passed = False
-        messages.append(
-            f"{Colors.RED}✗ Persistence P99 regression: {p99_increase_pct:.1f}% increase "
-            f"({baseline_p99:.2f} → {current_p99:.2f} ms){Colors.RESET}"
-        )
-    elif p99_increase_pct > thresholds["persistence_p99_increase_pct"] / 2:
-        messages.append(
-            f"{Colors.YELLOW}⚠ Persistence P99 warning: {p99_increase_pct:.1f}% increase "
-            f"({baseline_p99:.2f} → {current_p99:.2f} ms){Colors.RESET}"
-        )
-    else:
-        messages.append(
-            f"{Colors.GREEN}✓ Persistence P99 OK: {p99_increase_pct:+.1f}% "
-            f"({baseline_p99:.2f} → {current_p99:.2f} ms){Colors.RESET}"
-        )
+    passed, message = _check_metric(
+        "Persistence P99",
+        baseline["persistence"]["p99_ms"],
+        current["stats"]["p99_ms"],
+        thresholds["persistence_p99_increase_pct"],
+        "ms",
+    )
 
-    return passed, messages
+    return passed, [message]
 
 
 def main():
@@ -175,18 +198,37 @@ def main():
 
     args = parser.parse_args()
 
+    # Escape codes only help on a terminal; keep CI logs plain
+    if not sys.stdout.isatty():
+        Colors.disable()
+
     print(f"{Colors.BOLD}=== Performance Regression Check ==={Colors.RESET}\n")
 
     # Load baseline
     baseline = load_json(args.baseline)
-    if not baseline:
+    if not baseline or not validate(baseline, BASELINE_SCHEMA, args.baseline):
         return 1
 
     # Load current results
     current_spu = load_json(args.current)
-    if not current_spu:
+    if not current_spu or not validate(current_spu, SPU_ROW_SCHEMA, args.current):
         return 1
 
+    # Load persistence results (if provided) before the report, so any load
+    # error is printed ahead of it
+    current_persistence = None
+    persistence_valid = True
+    if args.current_persistence:
+        current_persistence = load_json(args.current_persistence)
+        if current_persistence and not validate(
+            current_persistence, PERSISTENCE_SCHEMA, args.current_persistence
+        ):
+            current_persistence = None
+            persistence_valid = False
+
+    # Index by primitive name once; checkers look rows up by name
+    current_index = {prim["primitive"]: prim for prim in current_spu}
+
     # Configure thresholds
     thresholds = {
         "spu_latency_increase_pct": args.spu_latency_threshold,
@@ -194,51 +236,48 @@ def main():
         "persistence_p99_increase_pct": args.persistence_p99_threshold,
     }
 
-    print(f"Thresholds:")
-    print(f"  SPU latency increase: {thresholds['spu_latency_increase_pct']}%")
-    print(
-        f"  SPU throughput decrease: {thresholds['spu_throughput_decrease_pct']}%"
-    )
-    print(
-        f"  Persistence P99 increase: {thresholds['persistence_p99_increase_pct']}%"
-    )
-    print()
+    # The report is collected and written once at the end
+    lines = [
+        "Thresholds:",
+        f"  SPU latency increase: {thresholds['spu_latency_increase_pct']}%",
+        f"  SPU throughput decrease: {thresholds['spu_throughput_decrease_pct']}%",
+        f"  Persistence P99 increase: {thresholds['persistence_p99_increase_pct']}%",
+        "",
+    ]
 
-    all_passed = True
+    all_passed = persistence_valid
 
     # Check SPU
-    print(f"{Colors.BOLD}SPU Merge Primitive:{Colors.RESET}")
-    spu_passed, spu_messages = check_spu_regression(baseline, current_spu, thresholds)
-    for msg in spu_messages:
-        print(f"  {msg}")
-    print()
+    lines.append(f"{Colors.BOLD}SPU Merge Primitive:{Colors.RESET}")
+    spu_passed, spu_messages = check_spu_regression(baseline, current_index, thresholds)
+    lines.extend(f"  {msg}" for msg in spu_messages)
+    lines.append("")
 
     all_passed = all_passed and spu_passed
 
     # Check persistence (if provided)
-    if args.current_persistence:
-        current_persistence = load_json(args.current_persistence)
-        if current_persistence:
-            print(f"{Colors.BOLD}Persistence:{Colors.RESET}")
-            persist_passed, persist_messages = check_persistence_regression(
-                baseline, current_persistence, thresholds
-            )
-            for msg in persist_messages:
-                print(f"  {msg}")
-            print()
+    if current_persistence:
+        lines.append(f"{Colors.BOLD}Persistence:{Colors.RESET}")
+        persist_passed, persist_messages = check_persistence_regression(
+            baseline, current_persistence, thresholds
+        )
+        lines.extend(f"  {msg}" for msg in persist_messages)
+        lines.append("")
 
-            all_passed = all_passed and persist_passed
+        all_passed = all_passed and persist_passed
 
     # Final result
-    print(f"{Colors.BOLD}Overall Result:{Colors.RESET}")
+    lines.append(f"{Colors.BOLD}Overall Result:{Colors.RESET}")
     if all_passed:
-        print(f"  {Colors.GREEN}{Colors.BOLD}✓ All checks passed{Colors.RESET}")
-        return 0
+        lines.append(f"  {Colors.GREEN}{Colors.BOLD}✓ All checks passed{Colors.RESET}")
     else:
-        print(
+        lines.append(
             f"  {Colors.RED}{Colors.BOLD}✗ Performance regression detected{Colors.RESET}"
         )
-        return 1
+
+    sys.stdout.write("\n".join(lines) + "\n")
+
+    return 0 if all_passed else 1
 
 
 if __name__ == "__main__":
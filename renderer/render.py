@@ -16,11 +16,32 @@ import sys
 from pathlib import Path
 
 try:
-    from PIL import Image, ImageDraw
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
 except ImportError:
     print("Error: PIL/Pillow required. Install: pip install Pillow", file=sys.stderr)
     sys.exit(1)
 
+try:
+    MEDIANCUT = Image.Quantize.MEDIANCUT
+    NO_DITHER = Image.Dither.NONE
+except AttributeError:  # Pillow < 9.1
+    MEDIANCUT = Image.MEDIANCUT
+    NO_DITHER = Image.NONE
+
+# Max distinct frames sampled to build the shared GIF palette
+PALETTE_SAMPLE_FRAMES = 8
+
+# Audible frequency range mapped onto the hue wheel (log scale)
+MIN_FREQ = 20.0
+MAX_FREQ = 20000.0
+LOG_MIN_FREQ = math.log(MIN_FREQ)
+LOG_FREQ_RANGE = math.log(MAX_FREQ) - LOG_MIN_FREQ
+
 
 class GlyphRenderer:
     """Parametric renderer for glyphs"""
@@ -31,11 +52,14 @@ class GlyphRenderer:
         self.bg_color = bg_color
         self.center_x = width // 2
         self.center_y = height // 2
+        # Loaded once: a fresh ImageDraw otherwise reloads it on every frame
+        self.font = ImageFont.load_default()
 
     def load_glyph(self, glyph_path):
         """Load glyph from JSON file"""
-        with open(glyph_path, 'r') as f:
-            return json.load(f)
+        with open(glyph_path, 'rb') as f:
+            data = f.read()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
 
     def energy_to_size(self, energy, base_size=50, scale=10):
         """
@@ -62,18 +86,11 @@ class GlyphRenderer:
         20000 Hz → 360° (red again)
         """
         # Logarithmic mapping feels more natural for frequency
-        min_freq = 20.0
-        max_freq = 20000.0
-
         # Clamp frequency
-        freq = max(min_freq, min(freq, max_freq))
-
-        # Log scale
-        log_freq = math.log(freq)
-        log_min = math.log(min_freq)
-        log_max = math.log(max_freq)
+        freq = max(MIN_FREQ, min(freq, MAX_FREQ))
 
-        normalized = (log_freq - log_min) / (log_max - log_min)
+        # Log scale (range endpoints precomputed at module level)
+        normalized = (math.log(freq) - LOG_MIN_FREQ) / LOG_FREQ_RANGE
         hue = normalized * 360.0
 
         return hue
@@ -187,12 +204,13 @@ class GlyphRenderer:
                 width=1
             )
 
-    def render_glyph(self, glyph, zoom=1.0):
-        """Render a single glyph at given zoom level"""
-        # Create image
-        img = Image.new('RGBA', (self.width, self.height), self.bg_color + (255,))
-        draw = ImageDraw.Draw(img)
+    def glyph_style(self, glyph):
+        """
+        Zoom-independent visual properties of a glyph
 
+        Returns: dict with energy, activated, freq, size (unzoomed), color,
+        shape and complexity
+        """
         # Extract glyph properties
         energy = glyph.get('state', {}).get('energy', 0.0)
         activated = glyph.get('state', {}).get('activated', False)
@@ -206,12 +224,39 @@ class GlyphRenderer:
             freq = resonance['tone'].get('freq', 440.0)
 
         # Calculate visual properties
-        base_size = self.energy_to_size(energy) * zoom
         brightness = self.energy_to_brightness(energy)
         hue = self.freq_to_hue(freq)
-        color = self.hue_to_rgb(hue, brightness)
-        shape = self.topology_to_shape(topology)
-        complexity = parameters.get('complexity', 3)
+
+        return {
+            "energy": energy,
+            "activated": activated,
+            "freq": freq,
+            "size": self.energy_to_size(energy),
+            "color": self.hue_to_rgb(hue, brightness),
+            "shape": self.topology_to_shape(topology),
+            "complexity": parameters.get('complexity', 3)
+        }
+
+    def render_glyph(self, glyph, zoom=1.0, style=None):
+        """
+        Render a single glyph at given zoom level
+
+        style: precomputed glyph_style(glyph), to skip recomputing it per frame
+        """
+        if style is None:
+            style = self.glyph_style(glyph)
+
+        # Create image
+        img = Image.new('RGBA', (self.width, self.height), self.bg_color + (255,))
+        draw = ImageDraw.Draw(img)
+
+        energy = style["energy"]
+        activated = style["activated"]
+        freq = style["freq"]
+        color = style["color"]
+        shape = style["shape"]
+        complexity = style["complexity"]
+        base_size = style["size"] * zoom
 
         # Draw main shape
         self.draw_shape(
@@ -243,26 +288,89 @@ class GlyphRenderer:
 
         # Add text overlay
         info_text = f"Energy: {energy:.2f} | Freq: {freq:.0f}Hz | Zoom: {zoom:.0f}x"
-        draw.text((10, 10), info_text, fill=(200, 200, 200))
+        draw.text((10, 10), info_text, fill=(200, 200, 200), font=self.font)
 
         if activated:
-            draw.text((10, 30), "ACTIVATED", fill=(0, 255, 0))
+            draw.text((10, 30), "ACTIVATED", fill=(0, 255, 0), font=self.font)
 
         return img
 
     def render_sequence(self, glyph, zoom_levels=[1.0, 4.0, 16.0], frames_per_zoom=4):
-        """Render a sequence of frames at different zoom levels"""
+        """
+        Render a sequence of frames at different zoom levels
+
+        Frames at the same zoom are identical, so each zoom level is
+        rasterized once and that image is repeated frames_per_zoom times
+        (the list shares the object; copy a frame before drawing on it).
+        """
         frames = []
 
+        # Hue, brightness and shape don't change between frames
+        style = self.glyph_style(glyph)
+
         for zoom in zoom_levels:
-            for _ in range(frames_per_zoom):
-                frame = self.render_glyph(glyph, zoom)
-                frames.append(frame)
+            frame = self.render_glyph(glyph, zoom, style)
+            frames.extend([frame] * frames_per_zoom)
 
         return frames
 
+    def shared_palette(self, frames):
+        """
+        Build one 256-colour palette image for a whole sequence
+
+        Median-cut over up to PALETTE_SAMPLE_FRAMES distinct frames,
+        stacked vertically into one image.
+        """
+        distinct = list({id(frame): frame for frame in frames}.values())
+        step = max(1, len(distinct) // PALETTE_SAMPLE_FRAMES)
+        sample = distinct[::step][:PALETTE_SAMPLE_FRAMES]
+
+        width, height = sample[0].size
+        combined = Image.new('RGB', (width, height * len(sample)))
+        for i, frame in enumerate(sample):
+            combined.paste(frame.convert('RGB'), (0, i * height))
+
+        return combined.quantize(colors=256, method=MEDIANCUT)
+
     def save_gif(self, frames, output_path, duration=100, loop=0):
-        """Save frames as animated GIF"""
+        """
+        Save frames as animated GIF
+
+        Frames are quantized once, against a single shared palette, before
+        encoding, instead of the encoder building a palette per frame.
+        Repeated (shared) frame objects are only converted once.
+        """
+        if not frames:
+            raise ValueError("No frames to save")
+
+        palette = self.shared_palette(frames)
+
+        converted = {}
+        pframes = []
+        for frame in frames:
+            pframe = converted.get(id(frame))
+            if pframe is None:
+                pframe = frame.convert('RGB').quantize(palette=palette, dither=NO_DITHER)
+                converted[id(frame)] = pframe
+            pframes.append(pframe)
+
+        pframes[0].save(
+            output_path,
+            save_all=True,
+            append_images=pframes[1:],
+            duration=duration,
+            loop=loop,
+            optimize=False
+        )
+
+    def save_webp(self, frames, output_path, duration=100, loop=0):
+        """
+        Save frames as animated WebP
+
+        WebP encodes RGBA directly (no palette step). Lossless at the
+        slowest/best method keeps exact colours and still comes out smaller
+        than the equivalent GIF for these flat-shaded frames.
+        """
         if not frames:
             raise ValueError("No frames to save")
 
@@ -272,14 +380,23 @@ class GlyphRenderer:
             append_images=frames[1:],
             duration=duration,
             loop=loop,
-            optimize=False
+            format='WEBP',
+            lossless=True,
+            method=6
         )
 
+    def save_animation(self, frames, output_path, duration=100, loop=0):
+        """Save frames as .webp or (any other extension) GIF"""
+        if Path(output_path).suffix.lower() == '.webp':
+            self.save_webp(frames, output_path, duration=duration, loop=loop)
+        else:
+            self.save_gif(frames, output_path, duration=duration, loop=loop)
+
 
 def main():
-    parser = argparse.ArgumentParser(description="Render glyph to GIF")
+    parser = argparse.ArgumentParser(description="Render glyph to GIF or animated WebP")
     parser.add_argument("glyph_path", help="Path to glyph JSON file")
-    parser.add_argument("--out", default="output.gif", help="Output GIF path")
+    parser.add_argument("--out", default="output.gif", help="Output path (.gif or .webp)")
     parser.add_argument("--duration", type=int, default=12, help="Total duration in seconds")
     parser.add_argument("--fps", type=int, default=12, help="Frames per second")
     parser.add_argument("--width", type=int, default=800, help="Image width")
@@ -308,12 +425,12 @@ def main():
     print(f"Rendering {total_frames} frames at zoom levels: {zoom_levels}")
     frames = renderer.render_sequence(glyph, zoom_levels, frames_per_zoom)
 
-    # Save GIF
-    print(f"Saving GIF to: {args.out}")
-    renderer.save_gif(frames, args.out, duration=frame_duration, loop=0)
+    # Save animation
+    print(f"Saving animation to: {args.out}")
+    renderer.save_animation(frames, args.out, duration=frame_duration, loop=0)
 
     print(f"Done! Created {len(frames)} frames")
-    print(f"GIF duration: {args.duration}s at {args.fps} fps")
+    print(f"Animation duration: {args.duration}s at {args.fps} fps")
 
     return 0
 
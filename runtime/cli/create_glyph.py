@@ -4,29 +4,74 @@ create_glyph.py - CLI tool to create a glyph with SHA256 content addressing
 """
 
 import argparse
-import hashlib
+import ctypes
+import functools
 import json
 import os
 import sys
 import tempfile
+from hashlib import sha256
 from pathlib import Path
 
-
+# Glyph ID hash: SHA-256, or BLAKE3 with GLYPH_HASH=blake3 (needs the blake3
+# package). Both give 64 hex chars, so the Merkle layout is unchanged, but
+# the IDs differ: a persistence tree must be written with one algorithm.
+GLYPH_HASH = os.environ.get("GLYPH_HASH", "sha256")
+if GLYPH_HASH == "sha256":
+    _id_hash = sha256
+elif GLYPH_HASH == "blake3":
+    from blake3 import blake3 as _id_hash
+else:
+    raise ValueError(f"GLYPH_HASH must be 'sha256' or 'blake3', not {GLYPH_HASH!r}")
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _syncfs = _libc.syncfs
+    _syncfs.argtypes = [ctypes.c_int]
+except (OSError, AttributeError):
+    _syncfs = None  # Not Linux/glibc: save_glyphs_batch fsyncs each file
+
+# Directories save_glyph has already created in this process
+_MKDIR_CACHE = set()
+
+# Flush a file's data (and the size/allocation metadata needed to read it
+# back) without also forcing its timestamps out; macOS has no fdatasync
+_datasync = getattr(os, "fdatasync", os.fsync)
+
+# Persistence locations; __file__ never changes, so build them once
+NVME_PERSISTENCE_PATH = Path("/mnt/persistence")
+LOCAL_PERSISTENCE_PATH = Path(__file__).parent / ".." / ".." / "persistence"
+
+
+@functools.lru_cache(maxsize=1)
 def get_persistence_path():
     """
     Get the persistence directory path with priority:
     1. /mnt/persistence (NVMe mount)
     2. ./persistence (fallback)
+
+    Resolved once per process (cached).
     """
-    # Check for NVMe mount
-    nvme_path = Path("/mnt/persistence")
-    if nvme_path.exists() or os.environ.get("GLYPH_FORCE_NVME"):
-        return nvme_path
+    # Check for NVMe mount (env var first: it skips the stat)
+    if os.environ.get("GLYPH_FORCE_NVME") or NVME_PERSISTENCE_PATH.exists():
+        return NVME_PERSISTENCE_PATH
 
     # Fallback to local persistence
-    script_dir = Path(__file__).parent
-    persistence_dir = script_dir / ".." / ".." / "persistence"
-    return persistence_dir.resolve()
+    return LOCAL_PERSISTENCE_PATH.resolve()
+
+
+def _content_bytes(content):
+    """
+    Normalize content to (utf8_buffer, text)
+
+    str is encoded once; bytes-like content is hashed as given and decoded
+    (strict UTF-8) only for the JSON "content" field, so both forms of the
+    same text get the same ID.
+    """
+    if isinstance(content, str):
+        return content.encode('utf-8'), content
+    buf = memoryview(content)
+    return buf, str(buf, 'utf-8')
 
 
 def create_glyph(content, metadata=None):
@@ -34,26 +79,120 @@ def create_glyph(content, metadata=None):
     Create a glyph with SHA256 content addressing
 
     Args:
-        content: The content of the glyph
+        content: The content of the glyph (str, or UTF-8 bytes-like)
         metadata: Optional metadata dictionary
 
     Returns:
         tuple: (glyph_id, glyph_dict)
     """
+    buf, text = _content_bytes(content)
+
     # Create glyph structure
     glyph = {
-        "content": content,
+        "content": text,
         "metadata": metadata or {}
     }
 
     # Generate SHA256 hash of content for ID
-    content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    content_hash = _id_hash(buf).hexdigest()
     glyph["id"] = content_hash
 
     return content_hash, glyph
 
 
-def save_glyph(glyph_id, glyph_data):
+def create_glyphs_batch(items):
+    """
+    Create many glyphs at once; same result as create_glyph per item
+
+    Args:
+        items: Iterable of (content, metadata) pairs
+
+    Returns:
+        list: [(glyph_id, glyph_dict), ...] in input order
+    """
+    glyphs = []
+    append = glyphs.append
+
+    for content, metadata in items:
+        buf, text = _content_bytes(content)
+        content_hash = _id_hash(buf).hexdigest()
+        append((content_hash, {
+            "content": text,
+            "metadata": metadata or {},
+            "id": content_hash
+        }))
+
+    return glyphs
+
+
+def _dumps(obj):
+    """
+    Serialize obj to 2-space-indented, key-sorted UTF-8 JSON bytes
+
+    The saved bytes must not depend on the environment, so this always
+    uses the stdlib encoder (orjson escapes and formats floats differently
+    and writes NaN as null). Non-ASCII text is written as raw UTF-8;
+    non-finite floats are written as NaN/Infinity, as json.dump always has.
+    Sorted keys make the bytes independent of dict insertion order, so
+    dedup's byte comparison matches equal glyphs.
+    """
+    return json.dumps(obj, indent=2, sort_keys=True, ensure_ascii=False).encode('utf-8')
+
+
+def _ensure_dir(path):
+    """mkdir -p, skipped for directories already created by this process"""
+    if path not in _MKDIR_CACHE:
+        path.mkdir(parents=True, exist_ok=True)
+        _MKDIR_CACHE.add(path)
+
+
+def _mkstemp(target_dir, glyph_id):
+    """Create the temp file a glyph is written to before its rename"""
+    try:
+        return tempfile.mkstemp(
+            dir=target_dir,
+            prefix=f".tmp_glyph_{glyph_id}_",
+            suffix=".json"
+        )
+    except FileNotFoundError:
+        # Directory was removed after we cached it: recreate and retry once
+        _MKDIR_CACHE.discard(target_dir)
+        _ensure_dir(target_dir)
+        return tempfile.mkstemp(
+            dir=target_dir,
+            prefix=f".tmp_glyph_{glyph_id}_",
+            suffix=".json"
+        )
+
+
+def _write_all(fd, data):
+    """os.write all of data (normally one syscall; loops on a short write)"""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _fsync_dir(path):
+    """fsync a directory so entries renamed into it survive a crash"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _same_bytes(path, data):
+    """True if the file at path exists and holds exactly data"""
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size != len(data):
+                return False
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def save_glyph(glyph_id, glyph_data, dedup=True):
     """
     Save glyph to persistence directory with atomic write and Merkle-style organization
 
@@ -63,6 +202,7 @@ def save_glyph(glyph_id, glyph_data):
     Args:
         glyph_id: The SHA256 hash ID
         glyph_data: The glyph dictionary
+        dedup: Skip the write (and fsync) if the file already holds these exact bytes
 
     Returns:
         str: Path to saved file
@@ -75,23 +215,27 @@ def save_glyph(glyph_id, glyph_data):
     prefix2 = glyph_id[2:4]
 
     target_dir = persistence_dir / prefix1 / prefix2
-    target_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(target_dir)
 
     file_path = target_dir / f"glyph_{glyph_id}.json"
+    payload = _dumps(glyph_data)
+
+    # The ID only covers content, so compare the whole file: same content
+    # with different metadata is still rewritten
+    if dedup and _same_bytes(file_path, payload):
+        return str(file_path)
 
     # Atomic write: write to temp file, then rename
     # This ensures no partial writes if process is interrupted
-    temp_fd, temp_path = tempfile.mkstemp(
-        dir=target_dir,
-        prefix=f".tmp_glyph_{glyph_id}_",
-        suffix=".json"
-    )
+    temp_fd, temp_path = _mkstemp(target_dir, glyph_id)
 
     try:
-        with os.fdopen(temp_fd, 'w') as f:
-            json.dump(glyph_data, f, indent=2)
-            f.flush()
-            os.fsync(f.fileno())  # Ensure data is written to disk
+        # One write of the pre-serialized bytes, no buffered file object
+        try:
+            _write_all(temp_fd, payload)
+            _datasync(temp_fd)  # Ensure data is written to disk
+        finally:
+            os.close(temp_fd)
 
         # Atomic rename
         os.rename(temp_path, file_path)
@@ -106,6 +250,74 @@ def save_glyph(glyph_id, glyph_data):
     return str(file_path)
 
 
+def save_glyphs_batch(items):
+    """
+    Save many glyphs with one filesystem sync instead of one fsync each
+
+    Same layout and atomicity as save_glyph: every glyph is written to a
+    temp file next to its final path, the whole batch is made durable with
+    a single syncfs() on the persistence filesystem (one fdatasync per file
+    where syncfs is unavailable), and only then are the temp files renamed
+    into place. A crash never exposes a partially written glyph. Each
+    directory a glyph was renamed into is then fsynced, so the new names
+    are durable too.
+
+    syncfs() flushes every dirty page on the persistence filesystem, not
+    just this batch's files, so its cost includes whatever else is writing
+    there. It pays off when the persistence directory has its own
+    filesystem (the /mnt/persistence NVMe mount); on a shared root
+    filesystem, prefer save_glyph for small batches.
+
+    Args:
+        items: Iterable of (glyph_id, glyph_data) pairs
+
+    Returns:
+        list: Paths to saved files, in input order
+    """
+    persistence_dir = get_persistence_path()
+    staged = []
+
+    try:
+        for glyph_id, glyph_data in items:
+            target_dir = persistence_dir / glyph_id[:2] / glyph_id[2:4]
+            _ensure_dir(target_dir)
+
+            temp_fd, temp_path = _mkstemp(target_dir, glyph_id)
+            staged.append((temp_path, target_dir / f"glyph_{glyph_id}.json"))
+
+            try:
+                _write_all(temp_fd, _dumps(glyph_data))
+                if _syncfs is None:
+                    _datasync(temp_fd)
+            finally:
+                os.close(temp_fd)
+
+        if _syncfs is not None and staged:
+            fd = os.open(persistence_dir, os.O_RDONLY)
+            try:
+                if _syncfs(fd) != 0:
+                    err = ctypes.get_errno()
+                    raise OSError(err, os.strerror(err))
+            finally:
+                os.close(fd)
+
+        for temp_path, file_path in staged:
+            os.rename(temp_path, file_path)
+    except Exception:
+        # Clean up temp files on error
+        for temp_path, _ in staged:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+        raise
+
+    for target_dir in dict.fromkeys(file_path.parent for _, file_path in staged):
+        _fsync_dir(target_dir)
+
+    return [str(file_path) for _, file_path in staged]
+
+
 def main():
     parser = argparse.ArgumentParser(description="Create a glyph with SHA256 content addressing")
     parser.add_argument("content", help="Content of the glyph")
@@ -4,27 +4,61 @@ query_glyph.py - CLI tool to query a glyph by ID
 """
 
 import argparse
+import functools
 import json
+import mmap
+from collections import OrderedDict, defaultdict
+import os
 import sys
 from pathlib import Path
 
-
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    _loads = json.loads
+else:
+    def _loads(data):
+        """orjson.loads, falling back to json for NaN/Infinity, which orjson rejects"""
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            return json.loads(bytes(data))
+
+# Files at least this big are never cached, and with orjson are parsed
+# straight from an mmap; below it, mmap setup costs more than the read()
+# copy it saves
+MMAP_THRESHOLD = 64 * 1024
+
+# Raw bytes of recently read glyph files under MMAP_THRESHOLD (so at most
+# QUERY_CACHE_SIZE * MMAP_THRESHOLD bytes), LRU by
+# (path, inode, mtime_ns, size). save_glyph always renames a new inode into
+# place, so a rewrite changes the key and stale bytes are never served.
+# Hits are re-parsed, so callers may mutate what they get back.
+QUERY_CACHE_SIZE = 4096
+_cache = OrderedDict()
+
+
+# Persistence locations; __file__ never changes, so build them once
+NVME_PERSISTENCE_PATH = Path("/mnt/persistence")
+LOCAL_PERSISTENCE_PATH = Path(__file__).parent / ".." / ".." / "persistence"
+
+
+@functools.lru_cache(maxsize=1)
 def get_persistence_path():
     """
     Get the persistence directory path with priority:
     1. /mnt/persistence (NVMe mount)
     2. ./persistence (fallback)
+
+    Resolved once per process (cached).
     """
-    import os
-    # Check for NVMe mount
-    nvme_path = Path("/mnt/persistence")
-    if nvme_path.exists() or os.environ.get("GLYPH_FORCE_NVME"):
-        return nvme_path
+    # Check for NVMe mount (env var first: it skips the stat)
+    if os.environ.get("GLYPH_FORCE_NVME") or NVME_PERSISTENCE_PATH.exists():
+        return NVME_PERSISTENCE_PATH
 
     # Fallback to local persistence
-    script_dir = Path(__file__).parent
-    persistence_dir = script_dir / ".." / ".." / "persistence"
-    return persistence_dir.resolve()
+    return LOCAL_PERSISTENCE_PATH.resolve()
 
 
 def query_glyph(glyph_id):
@@ -45,11 +79,88 @@ def query_glyph(glyph_id):
 
     file_path = persistence_dir / prefix1 / prefix2 / f"glyph_{glyph_id}.json"
 
-    if not file_path.exists():
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
         return None
 
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    key = (file_path, st.st_ino, st.st_mtime_ns, st.st_size)
+    data = _cache.get(key)
+    if data is not None:
+        _cache.move_to_end(key)
+        return _loads(data)
+
+    # One binary read straight into the parser (orjson when installed), on
+    # a raw fd: no buffered file object, and fstat pins the cache key to
+    # the inode actually read even if the file was replaced since the stat
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    try:
+        st = os.fstat(fd)
+        if orjson is not None and st.st_size >= MMAP_THRESHOLD:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return _loads(view)
+        data = os.read(fd, st.st_size)
+    finally:
+        os.close(fd)
+
+    if st.st_size >= MMAP_THRESHOLD:
+        return _loads(data)
+
+    key = (file_path, st.st_ino, st.st_mtime_ns, st.st_size)
+    _cache[key] = data
+    if len(_cache) > QUERY_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+    return _loads(data)
+
+
+def query_glyphs(glyph_ids):
+    """
+    Query many glyphs by ID
+
+    IDs are grouped by Merkle shard directory. Each directory is opened
+    once and its glyph files are opened relative to it (dir_fd), in sorted
+    order, so the directory path is resolved once per shard rather than
+    once per glyph. Reads bypass the query_glyph() cache.
+
+    Args:
+        glyph_ids: Iterable of SHA256 hash IDs
+
+    Returns:
+        dict: glyph_id -> glyph data (None if not found), in input order
+    """
+    glyph_ids = list(glyph_ids)
+    persistence_dir = get_persistence_path()
+
+    by_shard = defaultdict(list)
+    for glyph_id in glyph_ids:
+        by_shard[glyph_id[:2], glyph_id[2:4]].append(glyph_id)
+
+    results = {}
+    for (prefix1, prefix2), shard_ids in by_shard.items():
+        try:
+            dir_fd = os.open(persistence_dir / prefix1 / prefix2, os.O_RDONLY | os.O_DIRECTORY)
+        except FileNotFoundError:
+            results.update(dict.fromkeys(shard_ids))
+            continue
+
+        try:
+            for glyph_id in sorted(shard_ids):
+                try:
+                    fd = os.open(f"glyph_{glyph_id}.json", os.O_RDONLY, dir_fd=dir_fd)
+                except FileNotFoundError:
+                    results[glyph_id] = None
+                    continue
+                with open(fd, 'rb') as f:
+                    results[glyph_id] = _loads(f.read())
+        finally:
+            os.close(dir_fd)
+
+    return {glyph_id: results[glyph_id] for glyph_id in glyph_ids}
 
 
 def main():
@@ -58,15 +58,23 @@ def main():
         print(f"  Final energy: {step_info['final_energy']:.4f}", file=sys.stderr)
         print(f"  Activation count: {step_info['activation_count']}", file=sys.stderr)
 
+    updated_data = updated_glyph.to_dict()
+
     # Save if requested
     if args.save:
-        updated_data = updated_glyph.to_dict()
         file_path = create_glyph.save_glyph(updated_glyph.id, updated_data)
         if args.verbose:
             print(f"\nSaved updated glyph to: {file_path}", file=sys.stderr)
 
-    # Output updated glyph
-    print(json.dumps(updated_glyph.to_dict(), indent=2))
+    # Output updated glyph: indented for a terminal, compact for pipes.
+    # Piped output is always stdlib JSON written as UTF-8 bytes, so it does
+    # not depend on which encoders are installed or on the locale.
+    if sys.stdout.isatty():
+        print(json.dumps(updated_data, indent=2))
+    else:
+        line = json.dumps(updated_data, separators=(",", ":"), ensure_ascii=False)
+        sys.stdout.flush()
+        sys.stdout.buffer.write(line.encode('utf-8') + b"\n")
 
     return 0
 
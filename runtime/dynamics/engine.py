@@ -8,14 +8,48 @@ Implements three core rules:
 3. Decay - Glyph energy decays over time deterministically
 """
 
-import hashlib
 import json
+from hashlib import sha256
 from typing import Dict, List, Optional, Tuple
 
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+def _jit(**options):
+    """Compile with numba when it is installed, else leave the function as Python"""
+    def decorate(func):
+        if njit is None:
+            return func
+        return njit(cache=True, **options)(func)
+    return decorate
+
+
+# Numeric core of step_batch(). No fastmath: results must stay
+# bit-identical with and without numba. The decay factor is passed in
+# rather than computed here because numba lowers float ** int to repeated
+# multiplication, which does not match Python's pow() to the last bit.
+@_jit(parallel=True)
+def _step_batch_kernel(energies, activation_counts, last_update_times,
+                       decay_factor, threshold, time_delta, activated):
+    for i in prange(len(energies)):
+        energy = energies[i] * decay_factor
+        energies[i] = energy
+        hit = energy >= threshold
+        activation_counts[i] += hit
+        last_update_times[i] += time_delta
+        activated[i] = hit
+
+
 class Glyph:
     """Glyph with dynamics properties"""
 
+    __slots__ = ("id", "content", "metadata", "energy", "activation_count", "last_update_time")
+
     def __init__(self, id: str, content: str, metadata: Optional[Dict] = None):
         self.id = id
         self.content = content
@@ -26,17 +60,19 @@ class Glyph:
 
     def to_dict(self) -> Dict:
         """Convert glyph to dictionary"""
-        return {
-            "id": self.id,
-            "content": self.content,
-            "metadata": {
-                "energy": self.energy,
-                "activation_count": self.activation_count,
-                "last_update_time": self.last_update_time,
-                **{k: v for k, v in self.metadata.items()
-                   if k not in ["energy", "activation_count", "last_update_time"]}
-            }
+        metadata = {
+            "energy": self.energy,
+            "activation_count": self.activation_count,
+            "last_update_time": self.last_update_time
         }
+        # Copy the other keys in one C-level pass; the dynamics keys keep
+        # their leading position but take stale values, so re-store them
+        metadata.update(self.metadata)
+        metadata["energy"] = self.energy
+        metadata["activation_count"] = self.activation_count
+        metadata["last_update_time"] = self.last_update_time
+
+        return {"id": self.id, "content": self.content, "metadata": metadata}
 
     @classmethod
     def from_dict(cls, data: Dict) -> "Glyph":
@@ -61,6 +97,21 @@ class DynamicsEngine:
         """
         self.activation_threshold = activation_threshold
         self.decay_rate = max(0.0, min(1.0, decay_rate))  # Clamp to [0, 1]
+        self._decay_factors = {}  # time_delta -> decay factor
+
+    def decay_factor(self, time_delta: int) -> float:
+        """
+        Energy multiplier for time_delta time units: (1 - decay_rate)^time_delta
+
+        Steps almost always reuse the same few time_delta values, so the
+        factor is memoized per time_delta instead of calling pow() per step.
+        It is still computed with pow(), not exp(time_delta * log1p(-rate)),
+        which differs in the last bit and would change evolved energies.
+        """
+        factor = self._decay_factors.get(time_delta)
+        if factor is None:
+            factor = self._decay_factors[time_delta] = (1.0 - self.decay_rate) ** time_delta
+        return factor
 
     def apply_activation_threshold(self, glyph: Glyph) -> Tuple[Glyph, bool]:
         """
@@ -107,7 +158,7 @@ class DynamicsEngine:
         merged_content = f"{primary.content} + {secondary.content}"
 
         # Compute new ID from merged content
-        merged_id = hashlib.sha256(merged_content.encode('utf-8')).hexdigest()
+        merged_id = sha256(merged_content.encode()).hexdigest()
 
         # Sum energies
         merged_energy = primary.energy + secondary.energy
@@ -141,7 +192,7 @@ class DynamicsEngine:
             Glyph with decayed energy
         """
         # Exponential decay: E_new = E_old * (1 - decay_rate)^time_delta
-        decay_factor = (1.0 - self.decay_rate) ** time_delta
+        decay_factor = self.decay_factor(time_delta)
         glyph.energy = glyph.energy * decay_factor
         glyph.last_update_time += time_delta
 
@@ -162,20 +213,58 @@ class DynamicsEngine:
         Returns:
             (updated_glyph, step_info)
         """
+        initial_energy = glyph.energy
+
+        # Decay, then activation check, fused: same arithmetic as
+        # apply_decay() and apply_activation_threshold(), one write per field.
+        # Inlined rather than calling a jitted scalar kernel, whose dispatch
+        # from Python costs more than the arithmetic it compiles.
+        decay_factor = self._decay_factors.get(time_delta)
+        if decay_factor is None:
+            decay_factor = self.decay_factor(time_delta)
+        energy = initial_energy * decay_factor
+        activated = energy >= self.activation_threshold
+        activation_count = glyph.activation_count + activated
+
+        glyph.energy = energy
+        glyph.activation_count = activation_count
+        glyph.last_update_time += time_delta
+
         step_info = {
-            "initial_energy": glyph.energy,
+            "initial_energy": initial_energy,
             "time_delta": time_delta,
-            "activated": False
+            "activated": activated,
+            "energy_after_decay": energy,
+            "final_energy": energy,
+            "activation_count": activation_count
         }
 
-        # Apply decay
-        glyph = self.apply_decay(glyph, time_delta)
-        step_info["energy_after_decay"] = glyph.energy
+        return glyph, step_info
 
-        # Check activation
-        glyph, activated = self.apply_activation_threshold(glyph)
-        step_info["activated"] = activated
-        step_info["final_energy"] = glyph.energy
-        step_info["activation_count"] = glyph.activation_count
+    def step_batch(self, energies, activation_counts, last_update_times,
+                   time_delta: int = 1) -> bytearray:
+        """
+        Execute one dynamics step on many glyphs stored column-wise
 
-        return glyph, step_info
+        The three sequences (lists or array.array) hold one glyph per index
+        and are updated in place, with the same arithmetic as step(): the
+        decay factor is computed once for the batch instead of per glyph,
+        and no Glyph objects or step_info dicts are built. With numba
+        installed the loop runs compiled and in parallel; pass array.array
+        columns then, as numba cannot update Python lists in place (the
+        activated flags are returned in a bytearray for the same reason).
+
+        Args:
+            energies: Energy per glyph
+            activation_counts: Activation count per glyph
+            last_update_times: Last update time per glyph
+            time_delta: Time units since last step
+
+        Returns:
+            Per-glyph activated flags (1 or 0)
+        """
+        activated = bytearray(len(energies))
+        _step_batch_kernel(energies, activation_counts, last_update_times,
+                           self.decay_factor(time_delta),
+                           self.activation_threshold, time_delta, activated)
+        return activated
@@ -2,11 +2,14 @@
  * Python bindings for SPU merge primitive using pybind11
  *
  * Build: python3 setup.py build_ext --inplace
- * Usage: from spu_merge import merge, Glyph
+ * Usage: from spu_merge import merge, merge_batch, time_merge, Glyph
  */
 
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
+#include <chrono>
+#include <utility>
+#include <vector>
 #include "merge_ref.h"
 
 namespace py = pybind11;
@@ -59,6 +62,52 @@ PyGlyph py_merge(const PyGlyph& g1, const PyGlyph& g2) {
     return PyGlyph::from_cpp(result);
 }
 
+// Merge many pairs in one call, amortizing the per-call binding overhead.
+// pybind11 has already copied the arguments into C++ objects, so the loop
+// touches no Python state and runs with the GIL released; other Python
+// threads (e.g. more merge_batch callers) proceed meanwhile.
+std::vector<PyGlyph> py_merge_batch(const std::vector<std::pair<PyGlyph, PyGlyph>>& pairs) {
+    std::vector<PyGlyph> results;
+    results.reserve(pairs.size());
+
+    py::gil_scoped_release release;
+
+    Glyph result;
+    for (const auto& pair : pairs) {
+        Glyph cpp_g1 = pair.first.to_cpp();
+        Glyph cpp_g2 = pair.second.to_cpp();
+
+        merge(cpp_g1, cpp_g2, result);
+        results.push_back(PyGlyph::from_cpp(result));
+    }
+
+    return results;
+}
+
+// Benchmark harness: time `batches` runs of `batch_size` merges entirely in
+// C++ with the GIL released, so no Python call overhead lands in the samples.
+// Returns seconds per batch, the same shape as timeit.Timer.repeat().
+std::vector<double> py_time_merge(const PyGlyph& g1, const PyGlyph& g2,
+                                  size_t batches, size_t batch_size) {
+    Glyph cpp_g1 = g1.to_cpp();
+    Glyph cpp_g2 = g2.to_cpp();
+    std::vector<double> samples(batches);
+
+    py::gil_scoped_release release;
+
+    Glyph result;
+    for (size_t b = 0; b < batches; b++) {
+        auto start = std::chrono::steady_clock::now();
+        for (size_t i = 0; i < batch_size; i++) {
+            merge(cpp_g1, cpp_g2, result);
+        }
+        auto end = std::chrono::steady_clock::now();
+        samples[b] = std::chrono::duration<double>(end - start).count();
+    }
+
+    return samples;
+}
+
 // Module definition
 PYBIND11_MODULE(spu_merge, m) {
     m.doc() = "SPU merge primitive - C++ accelerated glyph merging";
@@ -83,6 +132,16 @@ PYBIND11_MODULE(spu_merge, m) {
           "Merge two glyphs with energy-based precedence",
           py::arg("glyph1"), py::arg("glyph2"));
 
+    // batched merge function
+    m.def("merge_batch", &py_merge_batch,
+          "Merge each (glyph1, glyph2) pair; returns the merged glyphs in order",
+          py::arg("pairs"));
+
+    // native timing loop for benchmarks
+    m.def("time_merge", &py_time_merge,
+          "Time batches of batch_size merges in C++; returns seconds per batch",
+          py::arg("glyph1"), py::arg("glyph2"), py::arg("batches"), py::arg("batch_size"));
+
     // Version info
     m.attr("__version__") = "1.0.0";
 }
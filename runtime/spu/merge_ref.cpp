@@ -64,22 +64,30 @@ void merge(const Glyph& g1, const Glyph& g2, Glyph& result) {
     }
 
     // Step 2: Concatenate content (primary + secondary)
-    uint16_t pos = 0;
+    // Straight into the fixed buffer, no temporaries; two full-length
+    // contents do not fit, so every piece is clamped to the space left
+    // (keeping a trailing NUL)
+    const size_t cap = sizeof(result.content) - 1;
+    size_t pos = 0;
+    size_t n;
 
     // Copy primary content
-    memcpy(result.content + pos, primary->content, primary->content_len);
-    pos += primary->content_len;
+    n = std::min<size_t>(primary->content_len, cap);
+    memcpy(result.content, primary->content, n);
+    pos += n;
 
     // Add separator " + "
-    result.content[pos++] = ' ';
-    result.content[pos++] = '+';
-    result.content[pos++] = ' ';
+    n = std::min<size_t>(3, cap - pos);
+    memcpy(result.content + pos, " + ", n);
+    pos += n;
 
     // Copy secondary content
-    memcpy(result.content + pos, secondary->content, secondary->content_len);
-    pos += secondary->content_len;
+    n = std::min<size_t>(secondary->content_len, cap - pos);
+    memcpy(result.content + pos, secondary->content, n);
+    pos += n;
 
-    result.content_len = pos;
+    result.content[pos] = '\0';
+    result.content_len = static_cast<uint16_t>(pos);
 
     // Step 3: Compute ID via SHA256 hash
     sha256_hash(result.content, result.content_len, result.id);
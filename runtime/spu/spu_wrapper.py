@@ -1,20 +1,23 @@
 """
-SPU merge Python wrapper using subprocess
+SPU merge Python wrapper
 
-Simple wrapper that calls the C++ merge_ref binary for testing.
-For production, use the pybind11 bindings (bindings.cpp).
+Pure-Python merge with the same precedence rules as the C++ reference
+(merge_ref.cpp), run in-process; nothing here shells out to the merge_ref
+binary. The pybind11 module (bindings.cpp) is the in-process C++ path,
+but its IDs come from merge_ref's simplified benchmark hash rather than
+SHA-256 (and content is capped at 255 bytes), so merge stays Python.
 """
 
-import json
-import subprocess
-import tempfile
-from pathlib import Path
-from typing import Dict, Any
+from hashlib import sha256
+from typing import Any, Dict, List
 
 
 class Glyph:
     """Python Glyph class compatible with C++ implementation"""
 
+    __slots__ = ("id", "content", "energy", "activation_count", "last_update_time",
+                 "parent1_id", "parent2_id")
+
     def __init__(
         self,
         id: str = "",
@@ -22,14 +25,16 @@ class Glyph:
         energy: float = 0.0,
         activation_count: int = 0,
         last_update_time: int = 0,
+        parent1_id: str = "",
+        parent2_id: str = "",
     ):
         self.id = id
         self.content = content
         self.energy = energy
         self.activation_count = activation_count
         self.last_update_time = last_update_time
-        self.parent1_id = ""
-        self.parent2_id = ""
+        self.parent1_id = parent1_id
+        self.parent2_id = parent2_id
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -42,15 +47,15 @@ class Glyph:
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Glyph":
-        g = cls()
-        g.id = data.get("id", "")
-        g.content = data.get("content", "")
-        g.energy = data.get("energy", 0.0)
-        g.activation_count = data.get("activation_count", 0)
-        g.last_update_time = data.get("last_update_time", 0)
-        g.parent1_id = data.get("parent1_id", "")
-        g.parent2_id = data.get("parent2_id", "")
-        return g
+        return cls(
+            data.get("id", ""),
+            data.get("content", ""),
+            data.get("energy", 0.0),
+            data.get("activation_count", 0),
+            data.get("last_update_time", 0),
+            data.get("parent1_id", ""),
+            data.get("parent2_id", ""),
+        )
 
     def __repr__(self):
         return f"<Glyph id='{self.id[:8]}...' energy={self.energy}>"
@@ -61,8 +66,6 @@ def merge_via_python(g1: Glyph, g2: Glyph) -> Glyph:
     Pure Python implementation of merge for comparison.
     Matches the C++ implementation logic.
     """
-    import hashlib
-
     # Determine precedence
     if g1.energy >= g2.energy:
         primary, secondary = g1, g2
@@ -73,47 +76,57 @@ def merge_via_python(g1: Glyph, g2: Glyph) -> Glyph:
     merged_content = f"{primary.content} + {secondary.content}"
 
     # Compute ID (simplified hash)
-    merged_id = hashlib.sha256(merged_content.encode()).hexdigest()
-
-    # Create result
-    result = Glyph()
-    result.id = merged_id
-    result.content = merged_content
-    result.energy = primary.energy + secondary.energy
-    result.activation_count = max(primary.activation_count, secondary.activation_count)
-    result.last_update_time = max(primary.last_update_time, secondary.last_update_time)
-    result.parent1_id = primary.id
-    result.parent2_id = secondary.id
+    merged_id = sha256(merged_content.encode()).hexdigest()
 
-    return result
+    # Create result in one constructor call
+    return Glyph(
+        merged_id,
+        merged_content,
+        primary.energy + secondary.energy,
+        max(primary.activation_count, secondary.activation_count),
+        max(primary.last_update_time, secondary.last_update_time),
+        primary.id,
+        secondary.id,
+    )
 
 
 # Alias for easier usage
 merge = merge_via_python
 
 
+def merge_batch(pairs) -> List[Glyph]:
+    """
+    Merge each (g1, g2) pair; same results as merge() per pair.
+
+    Mirrors spu_merge.merge_batch.
+    """
+    return [merge(g1, g2) for g1, g2 in pairs]
+
+
 def benchmark_merge(iterations: int = 10000) -> Dict[str, Any]:
     """
     Benchmark the merge function
     """
     import time
+    from itertools import repeat
 
     g1 = Glyph("id1", "content1", 2.0)
     g2 = Glyph("id2", "content2", 3.0)
+    merge_local = merge  # Local load in the timed loop, not a global lookup
 
     # Warmup
-    for _ in range(100):
-        merge(g1, g2)
+    for _ in repeat(None, 100):
+        merge_local(g1, g2)
 
-    # Benchmark
-    start = time.perf_counter()
-    for _ in range(iterations):
-        merge(g1, g2)
-    end = time.perf_counter()
+    # Benchmark (integer ns clock; converted once at the end)
+    start_ns = time.perf_counter_ns()
+    for _ in repeat(None, iterations):
+        merge_local(g1, g2)
+    total_ns = time.perf_counter_ns() - start_ns
 
-    total_time_ms = (end - start) * 1000
+    total_time_ms = total_ns / 1e6
     avg_latency_ms = total_time_ms / iterations
-    ops_per_sec = iterations / (end - start)
+    ops_per_sec = iterations * 1e9 / total_ns
 
     return {
         "primitive": "merge",
@@ -17,32 +17,54 @@ sys.path.insert(0, str(Path(__file__).parent / ".." / "cli"))
 import create_glyph
 import query_glyph
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+def read_json(path):
+    """Parse a saved glyph file from one binary read"""
+    return _loads(Path(path).read_bytes())
+
 
 class TestCreateQuery(unittest.TestCase):
     """Test cases for glyph creation and querying"""
 
-    def setUp(self):
-        """Set up test fixtures"""
-        # Create a temporary directory for testing
-        self.test_dir = tempfile.mkdtemp()
-        self.original_persistence_path = create_glyph.get_persistence_path
+    @classmethod
+    def setUpClass(cls):
+        """Set up one scratch directory for the whole class (tmpfs when available)"""
+        base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        cls.base_dir = tempfile.mkdtemp(dir=base)
+        cls.original_persistence_paths = (
+            create_glyph.get_persistence_path,
+            query_glyph.get_persistence_path
+        )
 
-        # Override get_persistence_path for both modules
+        # Override get_persistence_path for both modules; it follows
+        # test_dir, which setUp points at a fresh per-test subdirectory
         def mock_persistence_path():
-            return Path(self.test_dir)
+            return Path(cls.test_dir)
 
         create_glyph.get_persistence_path = mock_persistence_path
         query_glyph.get_persistence_path = mock_persistence_path
 
-    def tearDown(self):
-        """Clean up test fixtures"""
-        # Restore original function
-        create_glyph.get_persistence_path = self.original_persistence_path
-        query_glyph.get_persistence_path = self.original_persistence_path
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up class fixtures"""
+        # Restore original functions (each module has its own)
+        (create_glyph.get_persistence_path,
+         query_glyph.get_persistence_path) = cls.original_persistence_paths
 
-        # Clean up temporary directory
+        # Clean up the scratch directory once
         import shutil
-        shutil.rmtree(self.test_dir)
+        shutil.rmtree(cls.base_dir)
+
+    def setUp(self):
+        """Set up test fixtures"""
+        type(self).test_dir = os.path.join(self.base_dir, self._testMethodName)
+        os.mkdir(self.test_dir)
 
     def test_create_glyph(self):
         """Test creating a glyph with SHA256 content addressing"""
@@ -68,10 +90,143 @@ class TestCreateQuery(unittest.TestCase):
         self.assertTrue(file_path.endswith(f"glyph_{expected_id}.json"))
 
         # Verify file content
-        with open(file_path, 'r') as f:
-            saved_data = json.load(f)
+        saved_data = read_json(file_path)
         self.assertEqual(saved_data, glyph_data)
 
+    def test_create_glyph_bytes_content(self):
+        """Test bytes content gets the same ID and glyph as the str form"""
+        text = "Bytes glyph \u00e9"
+
+        self.assertEqual(
+            create_glyph.create_glyph(text.encode('utf-8'), {"k": 1}),
+            create_glyph.create_glyph(text, {"k": 1})
+        )
+
+    def test_create_glyphs_batch(self):
+        """Test batch creation matches create_glyph item by item"""
+        items = [("Batch glyph 1", {"n": 1}), ("Batch glyph 2", None)]
+
+        batch = create_glyph.create_glyphs_batch(items)
+
+        self.assertEqual(batch, [create_glyph.create_glyph(c, m) for c, m in items])
+        self.assertEqual(batch[0][0], hashlib.sha256(b"Batch glyph 1").hexdigest())
+
+    def test_save_glyphs_batch(self):
+        """Test batch save writes every glyph and leaves no temp files"""
+        items = create_glyph.create_glyphs_batch(
+            (f"Batch save glyph {i}", {"i": i}) for i in range(5)
+        )
+
+        paths = create_glyph.save_glyphs_batch(items)
+
+        self.assertEqual(len(paths), len(items))
+        for path, (glyph_id, glyph_data) in zip(paths, items):
+            self.assertTrue(path.endswith(f"glyph_{glyph_id}.json"))
+            self.assertEqual(read_json(path), glyph_data)
+
+        leftovers = [p for p in Path(self.test_dir).rglob(".tmp_glyph_*")]
+        self.assertEqual(leftovers, [])
+
+    def test_save_glyphs_batch_syncs_directories(self):
+        """Test batch save fsyncs each target directory once after the renames"""
+        items = create_glyph.create_glyphs_batch(
+            (f"Batch dir sync glyph {i}", None) for i in range(5)
+        )
+        synced = []
+        original = create_glyph._fsync_dir
+
+        def record(path):
+            synced.append(path)
+            original(path)
+
+        create_glyph._fsync_dir = record
+        try:
+            paths = create_glyph.save_glyphs_batch(items + items[:1])
+        finally:
+            create_glyph._fsync_dir = original
+
+        expected = {Path(path).parent for path in paths}
+        self.assertEqual(len(synced), len(expected))
+        self.assertEqual(set(synced), expected)
+
+    def test_save_glyph_dedup(self):
+        """Test identical re-saves are skipped but changed metadata is written"""
+        glyph_id, glyph_data = create_glyph.create_glyph("Dedup glyph", {"v": 1})
+        file_path = create_glyph.save_glyph(glyph_id, glyph_data)
+        inode = os.stat(file_path).st_ino
+
+        # Same bytes: file left as is
+        create_glyph.save_glyph(glyph_id, glyph_data)
+        self.assertEqual(os.stat(file_path).st_ino, inode)
+
+        # Same ID, different metadata: rewritten
+        _, changed = create_glyph.create_glyph("Dedup glyph", {"v": 2})
+        create_glyph.save_glyph(glyph_id, changed)
+        self.assertNotEqual(os.stat(file_path).st_ino, inode)
+        self.assertEqual(read_json(file_path)["metadata"], {"v": 2})
+
+    def test_save_glyph_sorted_keys(self):
+        """Test saved bytes do not depend on dict insertion order"""
+        glyph_id, glyph_data = create_glyph.create_glyph("Sorted glyph", {"b": 2, "a": 1})
+        file_path = create_glyph.save_glyph(glyph_id, glyph_data)
+        saved = Path(file_path).read_bytes()
+
+        self.assertEqual(
+            saved,
+            json.dumps(glyph_data, indent=2, sort_keys=True).encode('utf-8')
+        )
+
+        # Same glyph, keys inserted in another order: identical bytes
+        reordered = {"metadata": {"a": 1, "b": 2}, "id": glyph_id, "content": "Sorted glyph"}
+        create_glyph.save_glyph(glyph_id, reordered, dedup=False)
+        self.assertEqual(Path(file_path).read_bytes(), saved)
+
+    def test_save_glyph_exact_bytes(self):
+        """Test the on-disk encoding: raw UTF-8, sorted keys, 2-space indent"""
+        glyph_id, glyph_data = create_glyph.create_glyph(
+            "Caf\u00e9 \u2603", {"energy": 1e-05, "name": "\u00fc"}
+        )
+        file_path = create_glyph.save_glyph(glyph_id, glyph_data)
+
+        expected = (
+            '{\n'
+            '  "content": "Caf\u00e9 \u2603",\n'
+            f'  "id": "{glyph_id}",\n'
+            '  "metadata": {\n'
+            '    "energy": 1e-05,\n'
+            '    "name": "\u00fc"\n'
+            '  }\n'
+            '}'
+        ).encode('utf-8')
+        self.assertEqual(Path(file_path).read_bytes(), expected)
+
+    def test_save_glyph_non_finite(self):
+        """Test NaN/Infinity metadata is saved as stdlib JSON and reads back"""
+        glyph_id, glyph_data = create_glyph.create_glyph(
+            "Non-finite glyph", {"energy": float("inf"), "rate": float("nan")}
+        )
+        file_path = create_glyph.save_glyph(glyph_id, glyph_data)
+
+        with open(file_path, 'rb') as f:
+            saved = f.read()
+        self.assertIn(b'"energy": Infinity', saved)
+        self.assertIn(b'"rate": NaN', saved)
+
+        loaded = query_glyph.query_glyph(glyph_id)
+        self.assertEqual(loaded["metadata"]["energy"], float("inf"))
+        self.assertNotEqual(loaded["metadata"]["rate"], loaded["metadata"]["rate"])
+
+    def test_save_after_directory_removed(self):
+        """Test saving into a cached shard directory that was deleted"""
+        glyph_id, glyph_data = create_glyph.create_glyph("Removed dir glyph")
+        file_path = create_glyph.save_glyph(glyph_id, glyph_data)
+
+        import shutil
+        shutil.rmtree(Path(self.test_dir) / glyph_id[:2])
+
+        file_path = create_glyph.save_glyph(glyph_id, glyph_data)
+        self.assertTrue(os.path.exists(file_path))
+
     def test_query_glyph(self):
         """Test querying a glyph by ID"""
         # First, create a glyph
@@ -91,6 +246,55 @@ class TestCreateQuery(unittest.TestCase):
         self.assertEqual(queried_data["content"], test_content)
         self.assertEqual(queried_data["metadata"], test_metadata)
 
+    def test_query_glyph_sees_rewrites(self):
+        """Test repeated queries return fresh, up-to-date copies"""
+        glyph_id, glyph_data = create_glyph.create_glyph("Cached query glyph", {"v": 1})
+        create_glyph.save_glyph(glyph_id, glyph_data)
+
+        first = query_glyph.query_glyph(glyph_id)
+        first["metadata"]["v"] = 99
+        self.assertEqual(query_glyph.query_glyph(glyph_id), glyph_data)
+
+        # Same size, rewritten in place: must not be served from cache
+        _, rewritten = create_glyph.create_glyph("Cached query glyph", {"v": 2})
+        create_glyph.save_glyph(glyph_id, rewritten)
+        self.assertEqual(query_glyph.query_glyph(glyph_id), rewritten)
+
+    def test_query_glyph_large_not_cached(self):
+        """Test glyph files at or above MMAP_THRESHOLD are read but not cached"""
+        content = "x" * query_glyph.MMAP_THRESHOLD
+        glyph_id, glyph_data = create_glyph.create_glyph(content)
+        create_glyph.save_glyph(glyph_id, glyph_data)
+
+        cached = len(query_glyph._cache)
+        self.assertEqual(query_glyph.query_glyph(glyph_id), glyph_data)
+        self.assertEqual(len(query_glyph._cache), cached)
+
+    def test_query_glyph_after_miss(self):
+        """Test a glyph queried while missing is found right after it is saved"""
+        glyph_id, glyph_data = create_glyph.create_glyph("Late glyph")
+        self.assertIsNone(query_glyph.query_glyph(glyph_id))
+
+        create_glyph.save_glyph(glyph_id, glyph_data)
+        self.assertEqual(query_glyph.query_glyph(glyph_id), glyph_data)
+
+    def test_query_glyphs(self):
+        """Test batch query returns every glyph in input order, None if missing"""
+        saved = {}
+        for i in range(20):
+            glyph_id, glyph_data = create_glyph.create_glyph(f"Batch query glyph {i}")
+            create_glyph.save_glyph(glyph_id, glyph_data)
+            saved[glyph_id] = glyph_data
+
+        missing = "f" * 64
+        ids = list(reversed(saved)) + [missing]
+        results = query_glyph.query_glyphs(ids)
+
+        self.assertEqual(list(results), ids)
+        self.assertIsNone(results[missing])
+        for glyph_id, glyph_data in saved.items():
+            self.assertEqual(results[glyph_id], glyph_data)
+
 
 if __name__ == "__main__":
     unittest.main()
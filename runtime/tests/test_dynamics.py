@@ -15,6 +15,7 @@ from pathlib import Path
 # Add runtime modules to path
 sys.path.insert(0, str(Path(__file__).parent / ".."))
 
+from dynamics import engine as engine_module
 from dynamics.engine import Glyph, DynamicsEngine
 
 
@@ -28,28 +29,30 @@ class TestDynamicsProperties(unittest.TestCase):
     def test_activation_threshold_property_below_threshold(self):
         """Property: Glyphs with energy < threshold should not activate"""
         for energy in [0.0, 0.5, 0.9, 0.99]:
-            glyph = Glyph("test_id", "test content", {"energy": energy})
-            _, activated = self.engine.apply_activation_threshold(glyph)
-            self.assertFalse(
-                activated,
-                f"Glyph with energy {energy} should not activate (threshold=1.0)"
-            )
+            with self.subTest(energy=energy):
+                glyph = Glyph("test_id", "test content", {"energy": energy})
+                _, activated = self.engine.apply_activation_threshold(glyph)
+                self.assertFalse(
+                    activated,
+                    f"Glyph with energy {energy} should not activate (threshold=1.0)"
+                )
 
     def test_activation_threshold_property_at_or_above_threshold(self):
         """Property: Glyphs with energy >= threshold should activate"""
         for energy in [1.0, 1.5, 2.0, 10.0]:
-            glyph = Glyph("test_id", "test content", {"energy": energy})
-            initial_count = glyph.activation_count
-            _, activated = self.engine.apply_activation_threshold(glyph)
-            self.assertTrue(
-                activated,
-                f"Glyph with energy {energy} should activate (threshold=1.0)"
-            )
-            self.assertEqual(
-                glyph.activation_count,
-                initial_count + 1,
-                "Activation should increment counter"
-            )
+            with self.subTest(energy=energy):
+                glyph = Glyph("test_id", "test content", {"energy": energy})
+                initial_count = glyph.activation_count
+                _, activated = self.engine.apply_activation_threshold(glyph)
+                self.assertTrue(
+                    activated,
+                    f"Glyph with energy {energy} should activate (threshold=1.0)"
+                )
+                self.assertEqual(
+                    glyph.activation_count,
+                    initial_count + 1,
+                    "Activation should increment counter"
+                )
 
     def test_activation_is_deterministic(self):
         """Property: Activation is deterministic (same input = same output)"""
@@ -111,13 +114,14 @@ class TestDynamicsProperties(unittest.TestCase):
         initial_energy = glyph.energy
 
         for time_delta in [1, 5, 10]:
-            test_glyph = Glyph("id", "content", {"energy": initial_energy})
-            decayed = self.engine.apply_decay(test_glyph, time_delta)
-            self.assertLessEqual(
-                decayed.energy,
-                initial_energy,
-                f"Decay should not increase energy (time_delta={time_delta})"
-            )
+            with self.subTest(time_delta=time_delta):
+                test_glyph = Glyph("id", "content", {"energy": initial_energy})
+                decayed = self.engine.apply_decay(test_glyph, time_delta)
+                self.assertLessEqual(
+                    decayed.energy,
+                    initial_energy,
+                    f"Decay should not increase energy (time_delta={time_delta})"
+                )
 
     def test_decay_property_monotonic_decrease(self):
         """Property: Decay is monotonically decreasing over time"""
@@ -156,6 +160,15 @@ class TestDynamicsProperties(unittest.TestCase):
 
         self.assertEqual(decayed.energy, initial_energy)
 
+    def test_decay_factor_is_exact_pow(self):
+        """Property: memoized decay factors equal (1 - rate)^dt bit for bit"""
+        for time_delta in [0, 1, 2, 7, 1, 100, 2]:
+            with self.subTest(time_delta=time_delta):
+                self.assertEqual(
+                    self.engine.decay_factor(time_delta),
+                    (1.0 - self.engine.decay_rate) ** time_delta
+                )
+
     def test_step_property_combines_rules_deterministically(self):
         """Property: step() combines rules deterministically"""
         g1 = Glyph("id", "content", {"energy": 5.0, "last_update_time": 0})
@@ -179,6 +192,48 @@ class TestDynamicsProperties(unittest.TestCase):
         self.assertTrue(info["activated"], "High energy glyph should activate after decay")
         self.assertGreater(info["energy_after_decay"], self.engine.activation_threshold)
 
+    def test_step_batch_matches_step(self):
+        """Property: step_batch() on columns matches step() glyph by glyph"""
+        from array import array
+
+        initial = [0.5, 1.0, 1.2, 5.0, 10.0]
+        energies = array('d', initial)
+        counts = array('q', [0] * len(initial))
+        times = array('q', [0] * len(initial))
+
+        for _ in range(5):
+            activated = self.engine.step_batch(energies, counts, times, time_delta=2)
+
+        for i, energy in enumerate(initial):
+            glyph = Glyph("id", "content", {"energy": energy})
+            for _ in range(5):
+                glyph, info = self.engine.step(glyph, time_delta=2)
+
+            self.assertEqual(energies[i], glyph.energy)
+            self.assertEqual(counts[i], glyph.activation_count)
+            self.assertEqual(times[i], glyph.last_update_time)
+            self.assertEqual(activated[i], info["activated"])
+
+    @unittest.skipIf(engine_module.njit is None, "numba not installed")
+    def test_step_batch_compiled_matches_python(self):
+        """Property: the numba step_batch kernel matches its Python source bit for bit"""
+        from array import array
+
+        initial = [0.5, 1.0, 1.2, 5.0, 10.0] * 40
+        columns = []
+        for kernel in (engine_module._step_batch_kernel,
+                       engine_module._step_batch_kernel.py_func):
+            energies = array('d', initial)
+            counts = array('q', [0] * len(initial))
+            times = array('q', [0] * len(initial))
+            activated = bytearray(len(initial))
+            for _ in range(5):
+                kernel(energies, counts, times, self.engine.decay_factor(2),
+                       self.engine.activation_threshold, 2, activated)
+            columns.append((energies, counts, times, activated))
+
+        self.assertEqual(columns[0], columns[1])
+
     def test_glyph_serialization_roundtrip(self):
         """Property: Glyph serialization is reversible"""
         original = Glyph("test_id", "test content", {